@@ -1,13 +1,36 @@
-import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+import time
+
+# Taken before the remaining imports so --profile-startup can report them
+STARTUP_CLOCK = time.perf_counter()
+
 import sqlite3
-from datetime import datetime
+from datetime import datetime, timedelta
+import argparse
+import calendar
+import csv
+import gzip
+import io
+import json
+import multiprocessing
 import os
+import queue
+import re
 import shutil
-import tempfile
+import sys
+import threading
+from bisect import bisect_right
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import chain, islice
+from pathlib import Path
 
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
+# matplotlib and reportlab are imported where a chart or PDF is first made;
+# together they take longer to load than the rest of startup.
+
+# tkinter is imported by load_tkinter() when the GUI starts, so the command
+# line also runs on servers without Tk installed (no python3-tk).
+tk = ttk = messagebox = filedialog = None
 
 
 # ==========================================================
@@ -15,54 +38,139 @@ from matplotlib.figure import Figure
 # ==========================================================
 DB_PATH = "budget.db"
 
+# PRAGMAs applied to every connection. "wal" lets report reads run while a
+# write is in progress and only fsyncs at checkpoints instead of every commit;
+# "default" keeps SQLite's rollback journal (e.g. for databases on network shares).
+STORAGE_PROFILES = {
+    "default": {},
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -32000,       # KiB, i.e. 32 MB of page cache
+        "mmap_size": 268435456,     # 256 MB
+        "temp_store": "MEMORY",
+    },
+}
+DEFAULT_STORAGE_PROFILE = "wal"
+
 
 # ==========================================================
-# DATABASE SETUP
+# DATE HELPERS
 # ==========================================================
-conn = sqlite3.connect(DB_PATH)
-cursor = conn.cursor()
-
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS transactions (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    title TEXT,
-    amount REAL,
-    type TEXT,
-    category TEXT,
-    date TEXT
-)
-""")
-
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS settings (
-    id INTEGER PRIMARY KEY,
-    app_pin TEXT,
-    security_question TEXT,
-    security_answer TEXT,
-    monthly_budget REAL
-)
-""")
+DATE_FORMAT = "%d-%m-%Y %H:%M"      # shown in the UI and PDFs
+ISO_DATE_FORMAT = "%Y-%m-%d %H:%M"  # stored in date_iso for range queries
+
+MONTH_NAMES = ["January", "February", "March", "April", "May", "June",
+               "July", "August", "September", "October", "November", "December"]
+
+
+def month_range(year, month):
+    """Return the [start, end) date_iso bounds covering one calendar month."""
+    start = f"{year:04d}-{month:02d}-01"
+    if month == 12:
+        end = f"{year + 1:04d}-01-01"
+    else:
+        end = f"{year:04d}-{month + 1:02d}-01"
+    return start, end
+
+
+@lru_cache(maxsize=8192)
+def storage_dates(when):
+    """(date, date_iso) column values for a datetime."""
+    return when.strftime(DATE_FORMAT), when.strftime(ISO_DATE_FORMAT)
+
+
+# ==========================================================
+# TRANSACTION QUERIES
+# ==========================================================
+SORT_ORDERS = {
+    "Latest": "t.date_iso DESC, t.id DESC",
+    "Oldest": "t.date_iso ASC, t.id ASC",
+    "Highest": "t.amount DESC, t.id DESC",
+    "Lowest": "t.amount ASC, t.id ASC",
+    "Relevance": "transactions_fts.rank, t.id DESC",  # only with a full-text search
+}
+
+FTS_JOIN = " JOIN transactions_fts ON transactions_fts.rowid = t.id"
+
+
+# Search terms that name a type; the FTS index has no type column
+SEARCH_TYPE_NAMES = ("income", "expense")
+
+# Columns a search term the FTS index cannot answer is LIKE-matched against
+LIKE_SEARCH_COLUMNS = ("t.title", "t.category", "t.type", "t.date", "CAST(t.amount AS TEXT)")
+
+
+def split_search_terms(search_text):
+    """Split search text into (words for the FTS index, other terms).
+
+    The index only covers title and category, so terms without a letter
+    (amounts, dates) and type names ("income", "exp") are left for a LIKE
+    match over every displayed column.
+    """
+    words, others = [], []
+    for term in search_text.lower().split():
+        if re.search(r"[^\W\d_]", term) and not any(name.startswith(term) for name in SEARCH_TYPE_NAMES):
+            words.extend(re.findall(r"\w+", term))
+        else:
+            others.append(term)
+    return words, others
+
 
-conn.commit()
+def fts_match_expression(search_text):
+    """Build an FTS5 prefix query ("rent"* "may"*) from the words of free
+    text, or None when it has none."""
+    words, _ = split_search_terms(search_text)
+    return " ".join(f'"{w}"*' for w in words) or None
 
-# ---------------- ADD NEW COLUMNS IF NOT EXISTS ---------------- #
-cursor.execute("PRAGMA table_info(settings)")
-cols = [c[1] for c in cursor.fetchall()]
 
-if "currency" not in cols:
-    cursor.execute("ALTER TABLE settings ADD COLUMN currency TEXT DEFAULT 'INR'")
-    conn.commit()
+def build_transactions_filter(search_text, filter_type, use_fts=True):
+    """Turn the transactions page search box and type filter into a
+    FROM/JOIN clause, a WHERE clause (empty when nothing is filtered)
+    and its params. Every search term must match: words go through the
+    FTS5 index, anything else is a LIKE scan over the displayed columns."""
+    source = "transactions t"
+    clauses = []
+    params = []
 
-# Insert default settings if missing
-cursor.execute("SELECT * FROM settings WHERE id=1")
-row = cursor.fetchone()
+    if use_fts:
+        words, like_terms = split_search_terms(search_text)
+    else:
+        words, like_terms = [], search_text.lower().split()
 
-if row is None:
-    cursor.execute("""
-        INSERT INTO settings (id, app_pin, security_question, security_answer, monthly_budget, currency)
-        VALUES (1, ?, ?, ?, ?, ?)
-    """, ("1234", "What is your favourite color?", "pink", 0, "INR"))
-    conn.commit()
+    if words:
+        source += FTS_JOIN
+        clauses.append("transactions_fts MATCH ?")
+        params.append(" ".join(f'"{w}"*' for w in words))
+
+    for term in like_terms:
+        pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        clauses.append("(" + " OR ".join(f"{col} LIKE ? ESCAPE '\\'" for col in LIKE_SEARCH_COLUMNS) + ")")
+        params.extend([pattern] * len(LIKE_SEARCH_COLUMNS))
+
+    if filter_type in ("Income", "Expense"):
+        clauses.append("t.type = ?")
+        params.append(filter_type)
+
+    where = " WHERE " + " AND ".join(clauses) if clauses else ""
+    return source, where, params
+
+
+def build_transactions_query(search_text, filter_type, sort_option, limit=None, offset=0, use_fts=True):
+    """Return (sql, params) selecting one page of transactions rows as shown
+    in the transactions table: id, title, amount, currency, type, category, date."""
+    source, where, params = build_transactions_filter(search_text, filter_type, use_fts)
+
+    if sort_option == "Relevance" and FTS_JOIN not in source:
+        sort_option = "Latest"
+    order = SORT_ORDERS.get(sort_option, SORT_ORDERS["Latest"])
+
+    sql = (f"SELECT t.id, t.title, t.amount, t.currency, t.type, t.category, t.date "
+           f"FROM {source}{where} ORDER BY {order}")
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params = params + [limit, offset]
+    return sql, params
 
 
 # ==========================================================
@@ -147,12 +255,2238 @@ def rounded_button(parent, text, command, bg, fg, width=220, height=45):
     return canvas
 
 
+# ==========================================================
+# DATA ACCESS
+# ==========================================================
+class BudgetRepository:
+    """Owns one SQLite connection and every query PocketPlanner runs.
+
+    A connection must stay on the thread that opened it, so background
+    threads work on their own repository from clone().
+    """
+
+    # Bumped when init_schema() learns a new migration; stored in PRAGMA user_version
+    SCHEMA_VERSION = 3
+    STATEMENT_CACHE_SIZE = 256
+    BACKUP_PAGES_PER_STEP = 1024
+    IMPORT_BATCH_SIZE = 5000
+    EXPORT_CHUNK_SIZE = 5000
+
+    # The insert and delete triggers are kept here so insert_transactions()
+    # and clear_transactions() can suspend them for a bulk write
+    MONTHLY_TOTALS_INSERT_TRIGGER = """
+        CREATE TRIGGER IF NOT EXISTS trg_monthly_totals_insert
+        AFTER INSERT ON transactions
+        BEGIN
+            INSERT INTO monthly_totals (year, month, type, category, currency, total, tx_count)
+            VALUES (CAST(substr(new.date_iso, 1, 4) AS INTEGER),
+                    CAST(substr(new.date_iso, 6, 2) AS INTEGER),
+                    new.type, new.category, new.currency, new.amount, 1)
+            ON CONFLICT (year, month, type, category, currency)
+            DO UPDATE SET total = total + excluded.total, tx_count = tx_count + 1;
+        END
+    """
+
+    MONTHLY_TOTALS_DELETE_TRIGGER = """
+        CREATE TRIGGER IF NOT EXISTS trg_monthly_totals_delete
+        AFTER DELETE ON transactions
+        BEGIN
+            UPDATE monthly_totals
+            SET total = total - old.amount, tx_count = tx_count - 1
+            WHERE year = CAST(substr(old.date_iso, 1, 4) AS INTEGER)
+              AND month = CAST(substr(old.date_iso, 6, 2) AS INTEGER)
+              AND type = old.type AND category = old.category AND currency = old.currency;
+            DELETE FROM monthly_totals
+            WHERE year = CAST(substr(old.date_iso, 1, 4) AS INTEGER)
+              AND month = CAST(substr(old.date_iso, 6, 2) AS INTEGER)
+              AND type = old.type AND category = old.category AND currency = old.currency
+              AND tx_count <= 0;
+        END
+    """
+
+    FTS_INSERT_TRIGGER = """
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_insert
+        AFTER INSERT ON transactions
+        BEGIN
+            INSERT INTO transactions_fts (rowid, title, category)
+            VALUES (new.id, new.title, new.category);
+        END
+    """
+
+    FTS_DELETE_TRIGGER = """
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_delete
+        AFTER DELETE ON transactions
+        BEGIN
+            INSERT INTO transactions_fts (transactions_fts, rowid, title, category)
+            VALUES ('delete', old.id, old.title, old.category);
+        END
+    """
+
+    def __init__(self, path=DB_PATH, profile=DEFAULT_STORAGE_PROFILE):
+        self.path = path
+        self.profile = profile
+        self._open()
+
+    def _open(self):
+        """Connect with the storage profile's PRAGMAs and reset per-connection state."""
+        self.conn = sqlite3.connect(self.path, cached_statements=self.STATEMENT_CACHE_SIZE)
+        for name, value in STORAGE_PROFILES[self.profile].items():
+            self.conn.execute(f"PRAGMA {name}={value}")
+        self.transaction_depth = 0
+        self.fts_enabled = self.table_exists("transactions_fts")
+        self.invalidate_caches()
+
+    def clone(self):
+        """A new repository on the same database, for use on another thread."""
+        return BudgetRepository(self.path, self.profile)
+
+    def close(self):
+        self.conn.close()
+
+    def reconnect(self):
+        """Reopen the connection, e.g. after the file was restored from a backup."""
+        self.conn.close()
+        self._open()
+
+    @contextmanager
+    def transaction(self):
+        """Group several writes into a single commit.
+
+        Writes made inside the block are committed together when it exits and
+        rolled back if it raises. Blocks can be nested; only the outermost
+        one commits.
+        """
+        if self.transaction_depth == 0 and not self.conn.in_transaction:
+            self.conn.execute("BEGIN")
+        self.transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self.transaction_depth -= 1
+            if self.transaction_depth == 0:
+                self.conn.rollback()
+            raise
+        else:
+            self.transaction_depth -= 1
+            if self.transaction_depth == 0:
+                self.conn.commit()
+
+    def commit(self):
+        """Commit now, unless a transaction() block will commit later."""
+        if self.transaction_depth == 0:
+            self.conn.commit()
+
+    def backup_to(self, file_path, progress=None):
+        """Write a consistent copy of the database with SQLite's online backup API.
+
+        With progress, pages are copied in steps of BACKUP_PAGES_PER_STEP and
+        progress(fraction done) is called after each step.
+        """
+        target = sqlite3.connect(file_path)
+        try:
+            self.conn.backup(target, **self.backup_steps(progress))
+        finally:
+            target.close()
+
+    def restore_from(self, file_path, progress=None):
+        """Replace the database contents with a backup file, in place.
+
+        The file is validated first; other connections see the restored data
+        as soon as the copy is done. progress works as in backup_to().
+        """
+        # as_uri() escapes "#", "?" and spaces, which a raw path would not
+        source = sqlite3.connect(Path(file_path).resolve().as_uri() + "?mode=ro", uri=True)
+        try:
+            validate_backup(source, self.SCHEMA_VERSION)
+            source.backup(self.conn, **self.backup_steps(progress))
+        finally:
+            source.close()
+
+        # Older backups may predate some migrations
+        self.init_schema()
+        self.invalidate_caches()
+
+    def backup_steps(self, progress):
+        if progress is None:
+            return {}
+        return {
+            "pages": self.BACKUP_PAGES_PER_STEP,
+            "progress": lambda status, remaining, total: progress((total - remaining) / total if total else 1.0),
+        }
+
+    def change_marker(self):
+        """A value that changes whenever anything is committed to the database,
+        by this connection (total_changes) or another one (PRAGMA data_version)."""
+        return self.conn.total_changes, self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def integrity_check(self):
+        """Return a list of problems found by SQLite and the search index (empty when healthy)."""
+        problems = [row[0] for row in self.conn.execute("PRAGMA integrity_check")]
+        if problems == ["ok"]:
+            problems = []
+
+        if self.fts_enabled:
+            try:
+                self.conn.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('integrity-check')")
+            except sqlite3.DatabaseError as e:
+                problems.append(f"search index: {e}")
+            finally:
+                # The check writes nothing, but the INSERT opened a transaction
+                self.commit()
+        return problems
+
+    def table_exists(self, name):
+        row = self.conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?",
+                                (name,)).fetchone()
+        return row is not None
+
+    # ---------------- SCHEMA ---------------- #
+    def init_schema(self):
+        """Create missing tables, indexes and triggers and run column migrations."""
+        cursor = self.conn.cursor()
+
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT,
+            amount REAL,
+            type TEXT,
+            category TEXT,
+            date TEXT
+        )
+        """)
+
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS settings (
+            id INTEGER PRIMARY KEY,
+            app_pin TEXT,
+            security_question TEXT,
+            security_answer TEXT,
+            monthly_budget REAL
+        )
+        """)
+
+        self.conn.commit()
+
+        # ---------------- ADD NEW COLUMNS IF NOT EXISTS ---------------- #
+        cursor.execute("PRAGMA table_info(settings)")
+        cols = [c[1] for c in cursor.fetchall()]
+
+        if "currency" not in cols:
+            cursor.execute("ALTER TABLE settings ADD COLUMN currency TEXT DEFAULT 'INR'")
+            self.conn.commit()
+
+        # Auto-backup retention: newest copies to keep, maximum age in days
+        # (0 = no limit for either) and whether to gzip them
+        if "backup_keep" not in cols:
+            cursor.execute("ALTER TABLE settings ADD COLUMN backup_keep INTEGER DEFAULT 10")
+            cursor.execute("ALTER TABLE settings ADD COLUMN backup_max_age_days INTEGER DEFAULT 30")
+            cursor.execute("ALTER TABLE settings ADD COLUMN backup_compress INTEGER DEFAULT 0")
+            self.conn.commit()
+
+        # Sortable copy of the display date ("YYYY-MM-DD HH:MM"), so month/year
+        # filters can be answered by an index range scan instead of strptime per row
+        cursor.execute("PRAGMA table_info(transactions)")
+        trans_cols = [c[1] for c in cursor.fetchall()]
+
+        if "date_iso" not in trans_cols:
+            with self.transaction():
+                cursor.execute("ALTER TABLE transactions ADD COLUMN date_iso TEXT")
+                cursor.execute("""
+                    UPDATE transactions
+                    SET date_iso = substr(date, 7, 4) || '-' || substr(date, 4, 2) || '-' ||
+                                   substr(date, 1, 2) || substr(date, 11)
+                """)
+
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_transactions_date_iso ON transactions (date_iso)")
+        self.conn.commit()
+
+        # Currency of each transaction. Older rows were entered in whatever the
+        # settings named, so that becomes the column default (no table rewrite).
+        if "currency" not in trans_cols:
+            row = cursor.execute("SELECT currency FROM settings WHERE id=1").fetchone()
+            ledger_currency = (row[0] if row and row[0] else "INR").replace("'", "''")
+            cursor.execute(f"ALTER TABLE transactions ADD COLUMN currency TEXT NOT NULL DEFAULT '{ledger_currency}'")
+            self.conn.commit()
+
+        # Occurrences created from a recurring rule carry "<rule id>:<YYYY-MM-DD>",
+        # so materialize_recurring() never creates the same one twice
+        if "recurrence_key" not in trans_cols:
+            cursor.execute("ALTER TABLE transactions ADD COLUMN recurrence_key TEXT")
+            self.conn.commit()
+
+        cursor.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_recurrence_key
+            ON transactions (recurrence_key) WHERE recurrence_key IS NOT NULL
+        """)
+        self.conn.commit()
+
+        # ---------------- MONTHLY TOTALS ROLLUP ---------------- #
+        # One row per (year, month, type, category, currency), kept in sync by
+        # triggers so the dashboard and reports never have to scan the
+        # transactions table.
+        rollup_missing = not self.table_exists("monthly_totals")
+
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS monthly_totals (
+            year INTEGER,
+            month INTEGER,
+            type TEXT,
+            category TEXT,
+            currency TEXT,
+            total REAL NOT NULL DEFAULT 0,
+            tx_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (year, month, type, category, currency)
+        )
+        """)
+
+        cursor.execute(self.MONTHLY_TOTALS_INSERT_TRIGGER)
+        cursor.execute(self.MONTHLY_TOTALS_DELETE_TRIGGER)
+        cursor.executescript("""
+        CREATE TRIGGER IF NOT EXISTS trg_monthly_totals_update
+        AFTER UPDATE OF amount, type, category, date_iso, currency ON transactions
+        BEGIN
+            UPDATE monthly_totals
+            SET total = total - old.amount, tx_count = tx_count - 1
+            WHERE year = CAST(substr(old.date_iso, 1, 4) AS INTEGER)
+              AND month = CAST(substr(old.date_iso, 6, 2) AS INTEGER)
+              AND type = old.type AND category = old.category AND currency = old.currency;
+            INSERT INTO monthly_totals (year, month, type, category, currency, total, tx_count)
+            VALUES (CAST(substr(new.date_iso, 1, 4) AS INTEGER),
+                    CAST(substr(new.date_iso, 6, 2) AS INTEGER),
+                    new.type, new.category, new.currency, new.amount, 1)
+            ON CONFLICT (year, month, type, category, currency)
+            DO UPDATE SET total = total + excluded.total, tx_count = tx_count + 1;
+            DELETE FROM monthly_totals
+            WHERE year = CAST(substr(old.date_iso, 1, 4) AS INTEGER)
+              AND month = CAST(substr(old.date_iso, 6, 2) AS INTEGER)
+              AND type = old.type AND category = old.category AND currency = old.currency
+              AND tx_count <= 0;
+        END;
+        """)
+        self.conn.commit()
+
+        if rollup_missing:
+            self.rebuild_monthly_totals()
+
+        # Daily exchange rates: units of `currency` per one EXCHANGE_RATE_BASE
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS exchange_rates (
+            currency TEXT NOT NULL,
+            date_iso TEXT NOT NULL,
+            rate REAL NOT NULL,
+            PRIMARY KEY (currency, date_iso)
+        ) WITHOUT ROWID
+        """)
+        self.conn.commit()
+
+        # ---------------- RECURRING RULES ---------------- #
+        # start_date uses the date_iso format and fixes the time and day of month
+        # of every occurrence; materialized_until is the date_iso of the last
+        # materialize_recurring() run that covered the rule.
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS recurring_rules (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            amount REAL NOT NULL,
+            type TEXT NOT NULL,
+            category TEXT NOT NULL,
+            currency TEXT NOT NULL,
+            frequency TEXT NOT NULL,
+            interval INTEGER NOT NULL DEFAULT 1,
+            start_date TEXT NOT NULL,
+            end_date TEXT,
+            materialized_until TEXT
+        )
+        """)
+
+        # Amount changes: from effective_date ("YYYY-MM-DD") on, occurrences use amount
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS recurring_amounts (
+            rule_id INTEGER NOT NULL,
+            effective_date TEXT NOT NULL,
+            amount REAL NOT NULL,
+            PRIMARY KEY (rule_id, effective_date)
+        ) WITHOUT ROWID
+        """)
+        self.conn.commit()
+
+        # Indexes backing the transactions page filters and sort orders
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_transactions_type_date ON transactions (type, date_iso)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_transactions_amount ON transactions (amount)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_transactions_type_amount ON transactions (type, amount)")
+        self.conn.commit()
+
+        # ---------------- FULL-TEXT SEARCH INDEX ---------------- #
+        # External-content FTS5 index over title and category. Falls back to LIKE
+        # scans when the SQLite build has no FTS5.
+        fts_missing = not self.table_exists("transactions_fts")
+
+        try:
+            cursor.executescript("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+                title, category,
+                content='transactions', content_rowid='id', prefix='2 3'
+            );
+
+            CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_update
+            AFTER UPDATE OF title, category ON transactions
+            BEGIN
+                INSERT INTO transactions_fts (transactions_fts, rowid, title, category)
+                VALUES ('delete', old.id, old.title, old.category);
+                INSERT INTO transactions_fts (rowid, title, category)
+                VALUES (new.id, new.title, new.category);
+            END;
+            """)
+            cursor.execute(self.FTS_INSERT_TRIGGER)
+            cursor.execute(self.FTS_DELETE_TRIGGER)
+            self.fts_enabled = True
+        except sqlite3.OperationalError:
+            self.fts_enabled = False
+        self.conn.commit()
+
+        if fts_missing:
+            self.rebuild_search_index()
+
+        # Insert default settings if missing
+        cursor.execute("SELECT * FROM settings WHERE id=1")
+        row = cursor.fetchone()
+
+        if row is None:
+            cursor.execute("""
+                INSERT INTO settings (id, app_pin, security_question, security_answer, monthly_budget, currency)
+                VALUES (1, ?, ?, ?, ?, ?)
+            """, ("1234", "What is your favourite color?", "pink", 0, "INR"))
+            self.conn.commit()
+
+        cursor.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+
+    def rebuild_monthly_totals(self):
+        """Recompute the monthly_totals rollup from scratch (e.g. after a restore)."""
+        with self.transaction():
+            self.conn.execute("DELETE FROM monthly_totals")
+            self.conn.execute("""
+                INSERT INTO monthly_totals (year, month, type, category, currency, total, tx_count)
+                SELECT CAST(substr(date_iso, 1, 4) AS INTEGER),
+                       CAST(substr(date_iso, 6, 2) AS INTEGER),
+                       type, category, currency, SUM(amount), COUNT(*)
+                FROM transactions
+                GROUP BY 1, 2, type, category, currency
+            """)
+
+    def rebuild_search_index(self):
+        """Re-index every transaction title and category for full-text search."""
+        if self.fts_enabled:
+            self.conn.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild')")
+            self.commit()
+
+    # ---------------- SETTINGS ---------------- #
+    def settings(self):
+        """The settings row as a dict, read once and kept until a write or
+        restore through this repository (or invalidate_settings_cache())."""
+        if self.settings_cache is None:
+            cursor = self.conn.execute("SELECT * FROM settings WHERE id=1")
+            self.settings_cache = dict(zip((d[0] for d in cursor.description), cursor.fetchone()))
+        return self.settings_cache
+
+    def invalidate_caches(self):
+        """Forget cached settings and exchange rates, e.g. after a restore."""
+        self.invalidate_settings_cache()
+        self.invalidate_rate_caches()
+
+    def invalidate_settings_cache(self):
+        """Forget the cached settings row, e.g. when another connection may have changed it."""
+        self.settings_cache = None
+
+    def invalidate_rate_caches(self):
+        """Forget the rate index and conversion factors; needed only when
+        rates were imported through another connection."""
+        self.rates_cache = None
+        # (currency, year, month, display currency) -> conversion factor
+        self.factor_cache = {}
+
+    def get_setting(self, column):
+        return self.settings()[column]
+
+    def set_settings(self, **values):
+        assignments = ", ".join(f"{column}=?" for column in values)
+        self.conn.execute(f"UPDATE settings SET {assignments} WHERE id=1", tuple(values.values()))
+        self.commit()
+        self.settings_cache = None
+
+    def get_currency(self):
+        return self.get_setting("currency") or "INR"
+
+    def get_monthly_budget(self):
+        return self.get_setting("monthly_budget") or 0
+
+    def get_auto_backup_settings(self):
+        """(keep, max_age_days, compress) for the automatic backup on exit."""
+        settings = self.settings()
+        return settings["backup_keep"] or 0, settings["backup_max_age_days"] or 0, bool(settings["backup_compress"])
+
+    # ---------------- EXCHANGE RATES ---------------- #
+    def insert_exchange_rates(self, rows):
+        """Store (currency, datetime, rate) rows, replacing rates already
+        held for the same currency and day. Returns how many were written."""
+        rows = [(currency, when.strftime("%Y-%m-%d"), rate) for currency, when, rate in rows]
+        with self.transaction():
+            self.conn.executemany("""
+                INSERT INTO exchange_rates (currency, date_iso, rate) VALUES (?, ?, ?)
+                ON CONFLICT (currency, date_iso) DO UPDATE SET rate = excluded.rate
+            """, rows)
+        self.invalidate_rate_caches()
+        return len(rows)
+
+    def exchange_rates(self):
+        """Every stored rate as a build_rate_index() lookup, cached until the next import."""
+        if self.rates_cache is None:
+            rows = self.conn.execute(
+                "SELECT currency, CAST(replace(date_iso, '-', '') AS INTEGER), rate FROM exchange_rates").fetchall()
+            self.rates_cache = build_rate_index(rows)
+        return self.rates_cache
+
+    def conversion_factors(self, currencies, years, months):
+        """Multipliers taking amounts in currencies[i] during (years[i], months[i])
+        into the display currency, at the rate in force at that month's end.
+        Factors are remembered until the rates change."""
+        target = self.get_currency()
+        keys = [(currency, year, month, target) for currency, year, month in zip(currencies, years, months)]
+        missing = [key for key in set(keys) if key not in self.factor_cache and key[0] != target]
+        if missing:
+            days = [year * 10000 + month * 100 + 31 for _, year, month, _ in missing]
+            factors = exchange_factors(self.exchange_rates(), [key[0] for key in missing], days, target)
+            self.factor_cache.update(zip(missing, factors.tolist()))
+        return [self.factor_cache.get(key, 1.0) for key in keys]
+
+    def month_conversion_factors(self, year, month):
+        """{currency: factor} for the currencies used in one month."""
+        currencies = [r[0] for r in self.conn.execute(
+            "SELECT DISTINCT currency FROM monthly_totals WHERE year=? AND month=?", (year, month))]
+        factors = self.conversion_factors(currencies, [year] * len(currencies), [month] * len(currencies))
+        return dict(zip(currencies, factors))
+
+    def currencies_without_rates(self):
+        """Currencies in use (ledger or display) that no stored rate covers;
+        their amounts are counted unconverted."""
+        used = {r[0] for r in self.conn.execute("SELECT DISTINCT currency FROM monthly_totals")}
+        if len(used | {self.get_currency()}) == 1:
+            return []
+        known = {r[0] for r in self.conn.execute("SELECT DISTINCT currency FROM exchange_rates")}
+        return sorted((used | {self.get_currency()}) - known - {EXCHANGE_RATE_BASE})
+
+    # ---------------- REPORTS ---------------- #
+    def converted_totals(self, columns, where="", params=()):
+        """{(*columns): total} over the monthly_totals rollup in the display
+        currency; each (currency, year, month) bucket is converted at its own rate."""
+        group = ", ".join(columns)
+        rows = self.conn.execute(f"""
+            SELECT currency, year, month, {group}, SUM(total) FROM monthly_totals{where}
+            GROUP BY currency, year, month, {group}
+        """, params).fetchall()
+        if not rows:
+            return {}
+
+        buckets = list({row[:3] for row in rows})
+        factors = dict(zip(buckets, self.conversion_factors(*zip(*buckets))))
+        totals = {}
+        for row in rows:
+            key = row[3:-1]
+            totals[key] = totals.get(key, 0) + row[-1] * factors[row[:3]]
+        return totals
+
+    def summary(self):
+        """(income, expense, balance) over the whole ledger."""
+        totals = self.converted_totals(("type",))
+        income = totals.get(("Income",), 0)
+        expense = totals.get(("Expense",), 0)
+        return income, expense, income - expense
+
+    def month_expense(self, year, month):
+        totals = self.converted_totals(("type",), " WHERE type='Expense' AND year=? AND month=?", (year, month))
+        return totals.get(("Expense",), 0)
+
+    def period_totals(self, year=None, month=None):
+        """Return (year, month, type, category, total) buckets from the
+        monthly_totals rollup in the display currency, optionally limited
+        to one year or one month."""
+        where = ""
+        params = ()
+        if year is not None and month is not None:
+            where = " WHERE year=? AND month=?"
+            params = (year, month)
+        elif year is not None:
+            where = " WHERE year=?"
+            params = (year,)
+
+        totals = self.converted_totals(("year", "month", "type", "category"), where, params)
+        return [key + (total,) for key, total in sorted(totals.items())]
+
+    def category_totals(self):
+        """(category, expense total) pairs, largest first."""
+        totals = self.converted_totals(("category",), " WHERE type='Expense'")
+        rows = [(category, total) for (category,), total in totals.items()]
+        rows.sort(key=lambda x: x[1], reverse=True)
+        return rows
+
+    def report_years(self):
+        """Years that have data, newest first; the current year is always offered."""
+        years = {r[0] for r in self.conn.execute("SELECT DISTINCT year FROM monthly_totals")}
+        years.add(datetime.now().year)
+        return sorted(years, reverse=True)
+
+    def dashboard_data(self):
+        now = datetime.now()
+        return {
+            "summary": self.summary(),
+            "budget": self.get_monthly_budget(),
+            "month_expense": self.month_expense(now.year, now.month),
+            "categories": self.category_totals(),
+            "missing_rates": self.currencies_without_rates(),
+        }
+
+    # ---------------- TRANSACTIONS ---------------- #
+    def add_transaction(self, title, amount, t_type, category, when=None, currency=None):
+        when = when or datetime.now()
+        self.conn.execute("""
+            INSERT INTO transactions (title, amount, type, category, currency, date, date_iso)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (title, amount, t_type, category, currency or self.get_currency()) + storage_dates(when))
+        self.commit()
+
+    def insert_transactions(self, rows, on_batch=None):
+        """Bulk-insert (title, amount, type, category, datetime, currency) rows in one transaction.
+
+        Rows are written with executemany in batches of IMPORT_BATCH_SIZE and
+        on_batch(rows_so_far) is called after each. The per-row rollup and
+        search triggers are suspended meanwhile; the new rows are folded into
+        monthly_totals and the search index with one statement each at the end.
+        """
+        return self.insert_transaction_rows(
+            ((title, amount, t_type, category, currency, None) + storage_dates(when)
+             for title, amount, t_type, category, when, currency in rows), on_batch)
+
+    def insert_transaction_rows(self, rows, on_batch=None):
+        """insert_transactions() for rows already in column form:
+        (title, amount, type, category, currency, recurrence_key, date, date_iso).
+
+        Rows whose recurrence_key is already in the table are skipped; the
+        return value counts only the rows actually inserted.
+        """
+        rows = iter(rows)
+        count = 0
+
+        with self.transaction():
+            last_id = self.conn.execute("SELECT IFNULL(MAX(id), 0) FROM transactions").fetchone()[0]
+            self.conn.execute("DROP TRIGGER IF EXISTS trg_monthly_totals_insert")
+            self.conn.execute("DROP TRIGGER IF EXISTS trg_transactions_fts_insert")
+
+            while True:
+                batch = list(islice(rows, self.IMPORT_BATCH_SIZE))
+                if not batch:
+                    break
+                count += self.conn.executemany("""
+                    INSERT INTO transactions
+                        (title, amount, type, category, currency, recurrence_key, date, date_iso)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (recurrence_key) WHERE recurrence_key IS NOT NULL DO NOTHING
+                """, batch).rowcount
+                if on_batch:
+                    on_batch(count)
+
+            self.conn.execute("""
+                INSERT INTO monthly_totals (year, month, type, category, currency, total, tx_count)
+                SELECT CAST(substr(date_iso, 1, 4) AS INTEGER),
+                       CAST(substr(date_iso, 6, 2) AS INTEGER),
+                       type, category, currency, SUM(amount), COUNT(*)
+                FROM transactions
+                WHERE id > ?
+                GROUP BY 1, 2, type, category, currency
+                ON CONFLICT (year, month, type, category, currency)
+                DO UPDATE SET total = total + excluded.total, tx_count = tx_count + excluded.tx_count
+            """, (last_id,))
+            self.conn.execute(self.MONTHLY_TOTALS_INSERT_TRIGGER)
+
+            if self.fts_enabled:
+                self.conn.execute("""
+                    INSERT INTO transactions_fts (rowid, title, category)
+                    SELECT id, title, category FROM transactions WHERE id > ?
+                """, (last_id,))
+                self.conn.execute(self.FTS_INSERT_TRIGGER)
+
+        return count
+
+    def update_transaction(self, trans_id, title, amount, t_type, category, currency):
+        self.conn.execute("""
+            UPDATE transactions
+            SET title=?, amount=?, type=?, category=?, currency=?
+            WHERE id=?
+        """, (title, amount, t_type, category, currency, trans_id))
+        self.commit()
+
+    def delete_transaction(self, trans_id):
+        self.conn.execute("DELETE FROM transactions WHERE id=?", (trans_id,))
+        self.commit()
+
+    def clear_transactions(self):
+        """Delete every transaction in one transaction. The per-row delete
+        triggers are suspended; the rollup and search index are emptied
+        with one statement each instead."""
+        with self.transaction():
+            self.conn.execute("DROP TRIGGER IF EXISTS trg_monthly_totals_delete")
+            self.conn.execute("DROP TRIGGER IF EXISTS trg_transactions_fts_delete")
+
+            self.conn.execute("DELETE FROM transactions")
+            self.conn.execute("DELETE FROM monthly_totals")
+            self.conn.execute(self.MONTHLY_TOTALS_DELETE_TRIGGER)
+
+            if self.fts_enabled:
+                self.conn.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('delete-all')")
+                self.conn.execute(self.FTS_DELETE_TRIGGER)
+
+    def get_transaction(self, trans_id):
+        return self.conn.execute(
+            "SELECT id, title, amount, currency, type, category, date FROM transactions WHERE id=?",
+            (trans_id,)).fetchone()
+
+    def transactions_page(self, search_text, filter_type, sort_option, limit, offset=0):
+        sql, params = build_transactions_query(search_text, filter_type, sort_option, limit, offset,
+                                               use_fts=self.fts_enabled)
+        return self.conn.execute(sql, params).fetchall()
+
+    def count_transactions(self, search_text, filter_type):
+        source, where, params = build_transactions_filter(search_text, filter_type,
+                                                          use_fts=self.fts_enabled)
+        return self.conn.execute(f"SELECT COUNT(*) FROM {source}{where}", params).fetchone()[0]
+
+    # ---------------- RECURRING ---------------- #
+    def add_recurring_rule(self, title, amount, t_type, category, currency, frequency,
+                           interval=1, start=None, end=None):
+        """Store a rule repeating every `interval` days/weeks/months/years from
+        start (default now) through end (inclusive, None = forever) and return
+        its id. Its transactions are created by materialize_recurring()."""
+        if frequency not in RECURRING_FREQUENCIES or interval < 1:
+            raise ValueError(f"Unknown recurrence: every {interval} {frequency}")
+        start = start or datetime.now()
+        if end is not None and end.date() < start.date():
+            raise ValueError(f"The end date {end:%d-%m-%Y} is before the start date {start:%d-%m-%Y}")
+        cursor = self.conn.execute("""
+            INSERT INTO recurring_rules
+                (title, amount, type, category, currency, frequency, interval, start_date, end_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (title, amount, t_type, category, currency, frequency, interval,
+              start.strftime(ISO_DATE_FORMAT), end.strftime("%Y-%m-%d") if end else None))
+        self.commit()
+        return cursor.lastrowid
+
+    def recurring_rules(self):
+        """(id, title, amount, currency, type, category, frequency, interval,
+        start_date, end_date) rows, with the amount in effect today."""
+        return self.conn.execute("""
+            SELECT r.id, r.title,
+                   IFNULL((SELECT a.amount FROM recurring_amounts a
+                           WHERE a.rule_id = r.id AND a.effective_date <= ?
+                           ORDER BY a.effective_date DESC LIMIT 1), r.amount),
+                   r.currency, r.type, r.category, r.frequency, r.interval, r.start_date, r.end_date
+            FROM recurring_rules r
+            ORDER BY r.title COLLATE NOCASE, r.id
+        """, (datetime.now().strftime("%Y-%m-%d"),)).fetchall()
+
+    def change_recurring_amount(self, rule_id, amount, effective=None):
+        """Occurrences of a rule from effective (default today) on use amount;
+        ones already created keep theirs."""
+        effective = (effective or datetime.now()).strftime("%Y-%m-%d")
+        self.conn.execute("""
+            INSERT INTO recurring_amounts (rule_id, effective_date, amount) VALUES (?, ?, ?)
+            ON CONFLICT (rule_id, effective_date) DO UPDATE SET amount = excluded.amount
+        """, (rule_id, effective, amount))
+        self.commit()
+
+    def end_recurring_rule(self, rule_id, end=None):
+        """Stop a rule after end (default today); occurrences already created are kept."""
+        self.conn.execute("UPDATE recurring_rules SET end_date=? WHERE id=?",
+                          ((end or datetime.now()).strftime("%Y-%m-%d"), rule_id))
+        self.commit()
+
+    def delete_recurring_rule(self, rule_id):
+        """Remove a rule; the transactions it already created stay."""
+        with self.transaction():
+            self.conn.execute("DELETE FROM recurring_amounts WHERE rule_id=?", (rule_id,))
+            self.conn.execute("DELETE FROM recurring_rules WHERE id=?", (rule_id,))
+
+    def materialize_recurring(self, now=None):
+        """Create every occurrence of the recurring rules that fell due since
+        the last run, up to now, and return how many were created.
+
+        All of them go through insert_transaction_rows() in one transaction,
+        together with the rules' new materialized_until, so catching up after
+        months away is a single batched write. Each occurrence carries a
+        "<rule id>:<YYYY-MM-DD>" recurrence_key and ones that already exist are
+        skipped, so an interrupted or repeated run never duplicates anything.
+        """
+        now = now or datetime.now()
+        stamp = now.strftime(ISO_DATE_FORMAT)
+        rules = self.conn.execute("""
+            SELECT id, title, amount, type, category, currency, frequency, interval,
+                   start_date, end_date, materialized_until
+            FROM recurring_rules
+            WHERE start_date <= ?
+              AND (materialized_until IS NULL OR materialized_until < ?)
+              AND (end_date IS NULL OR materialized_until IS NULL OR materialized_until < end_date || ' 23:59')
+        """, (stamp, stamp)).fetchall()
+        if not rules:
+            return 0
+
+        amount_changes = {}
+        for rule_id, effective, amount in self.conn.execute(
+                "SELECT rule_id, effective_date, amount FROM recurring_amounts ORDER BY rule_id, effective_date"):
+            dates, amounts = amount_changes.setdefault(rule_id, ([], []))
+            dates.append(effective)
+            amounts.append(amount)
+
+        rows = []
+        for (rule_id, title, amount, t_type, category, currency, frequency, interval,
+             start, end, done) in rules:
+            until = now
+            if end:
+                until = min(now, datetime.strptime(end, "%Y-%m-%d").replace(hour=23, minute=59))
+            after = datetime.strptime(done, ISO_DATE_FORMAT) if done else None
+            dates, amounts = amount_changes.get(rule_id, ((), ()))
+
+            for when in recurring_occurrences(frequency, interval, datetime.strptime(start, ISO_DATE_FORMAT),
+                                              until, after):
+                date, date_iso = storage_dates(when)
+                day = date_iso[:10]
+                changed = bisect_right(dates, day) - 1
+                rows.append((title, amounts[changed] if changed >= 0 else amount, t_type, category, currency,
+                             f"{rule_id}:{day}", date, date_iso))
+
+        with self.transaction():
+            created = self.insert_transaction_rows(rows) if rows else 0
+            self.conn.executemany("UPDATE recurring_rules SET materialized_until=? WHERE id=?",
+                                  [(stamp, rule[0]) for rule in rules])
+        return created
+
+    # ---------------- STREAMING READS ---------------- #
+    def iter_chunks(self, sql, params=()):
+        """Yield the rows of a query in lists of EXPORT_CHUNK_SIZE."""
+        cursor = self.conn.execute(sql, params)
+        try:
+            while True:
+                chunk = cursor.fetchmany(self.EXPORT_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            cursor.close()
+
+    def iter_transactions(self, search_text, filter_type, sort_option):
+        sql, params = build_transactions_query(search_text, filter_type, sort_option,
+                                               use_fts=self.fts_enabled)
+        return self.iter_chunks(sql, params)
+
+    def iter_month_transactions(self, year, month):
+        """(title, amount, type, category, date, currency) rows of one month, oldest first, in chunks."""
+        start, end = month_range(year, month)
+        return self.iter_chunks("""
+            SELECT title, amount, type, category, date, currency FROM transactions
+            WHERE date_iso >= ? AND date_iso < ?
+            ORDER BY date_iso
+        """, (start, end))
+
+    def iter_monthly_totals(self, filter_type="All"):
+        where, params = ("", ()) if filter_type == "All" else (" WHERE type=?", (filter_type,))
+        return self.iter_chunks(f"""
+            SELECT year, month, type, category, currency, total, tx_count FROM monthly_totals{where}
+            ORDER BY year, month, type, category, currency
+        """, params)
+
+    def iter_category_totals(self, filter_type="All"):
+        where, params = ("", ()) if filter_type == "All" else (" WHERE type=?", (filter_type,))
+        return self.iter_chunks(f"""
+            SELECT category, type, currency, SUM(total), SUM(tx_count) FROM monthly_totals{where}
+            GROUP BY category, type, currency
+            ORDER BY type, currency, SUM(total) DESC
+        """, params)
+
+
+# ==========================================================
+# STATEMENT IMPORT
+# ==========================================================
+# Readers yield (title, amount, type, category, datetime, currency) per statement
+# line, or None for a line that cannot be parsed, without loading the whole file.
+IMPORT_DATE_FORMATS = (
+    "%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%d-%m-%Y %H:%M",
+    "%d-%m-%Y", "%d/%m/%Y", "%m/%d/%Y", "%d/%m/%y", "%m/%d/%y",
+    "%d.%m.%Y", "%Y/%m/%d", "%d %b %Y", "%d-%b-%Y", "%b %d, %Y", "%Y%m%d",
+)
+
+# Keywords looked up in a line's description when its category is not one of ours
+IMPORT_CATEGORY_KEYWORDS = {
+    "Food 🍔": ("food", "grocer", "restaurant", "cafe", "coffee", "pizza", "swiggy", "zomato", "supermarket"),
+    "Travel 🚗": ("travel", "uber", "lyft", "ola", "taxi", "fuel", "petrol", "airline", "flight", "train", "metro"),
+    "Shopping 🛍️": ("shopping", "amazon", "flipkart", "store", "mall"),
+    "Bills 💡": ("bill", "electric", "water", "gas", "internet", "phone", "mobile", "rent", "insurance", "utility"),
+    "Health 💊": ("health", "pharmacy", "hospital", "doctor", "clinic", "medical"),
+    "Salary 💼": ("salary", "payroll", "wage"),
+    "Education 📚": ("education", "school", "college", "tuition", "course", "book"),
+    "Entertainment 🎬": ("entertainment", "netflix", "spotify", "cinema", "movie", "game"),
+    "Gifts 🎁": ("gift", "donation"),
+}
+
+IMPORT_CATEGORY_PATTERNS = {
+    name: re.compile(r"\b(?:" + "|".join(keywords) + ")")
+    for name, keywords in IMPORT_CATEGORY_KEYWORDS.items()
+}
+
+CSV_IMPORT_FIELDS = ["date", "title", "amount", "debit", "credit", "type", "category", "currency"]
+
+# Header names a CSV column is matched against when guessing the mapping
+CSV_FIELD_ALIASES = {
+    "date": ("date", "transaction date", "posting date", "posted date", "value date"),
+    "title": ("description", "title", "narration", "details", "payee", "memo", "name"),
+    "amount": ("amount", "value", "transaction amount"),
+    "debit": ("debit", "withdrawal", "withdrawals", "money out", "paid out"),
+    "credit": ("credit", "deposit", "deposits", "money in", "paid in"),
+    "type": ("type", "dr/cr", "cr/dr", "transaction type"),
+    "category": ("category",),
+    "currency": ("currency", "ccy", "currency code"),
+}
+
+
+@lru_cache(maxsize=8192)
+def parse_import_date(text, date_format=None):
+    """Parse one typed date, trying date_format first, then every known format.
+
+    Returns (datetime, format used). Statements are not read with this: a
+    whole file must use one format, see detect_date_format().
+    """
+    text = text.strip()
+    formats = (date_format,) + IMPORT_DATE_FORMATS if date_format else IMPORT_DATE_FORMATS
+    for fmt in formats:
+        try:
+            return datetime.strptime(text, fmt), fmt
+        except ValueError:
+            continue
+    raise ValueError(f"Unknown date format: {text!r}")
+
+
+# Statement lines whose dates pick the format the whole statement is read with
+DATE_SAMPLE_SIZE = 1000
+
+
+def detect_date_format(texts):
+    """Pick the IMPORT_DATE_FORMATS entry that reads the most of a sample of
+    a statement's dates, or None for an empty sample.
+
+    Raises ValueError when no format reads them, or when two formats read
+    the sample equally well but differently (01/05/2024 as 1 May or 5 Jan):
+    the user has to say which one the statement uses.
+    """
+    texts = sorted({text.strip() for text in texts if text and text.strip()})
+    parsed = {}
+    most = 0
+    for fmt in IMPORT_DATE_FORMATS:
+        dates = {}
+        failures = 0
+        for text in texts:
+            try:
+                dates[text] = datetime.strptime(text, fmt)
+            except ValueError:
+                failures += 1
+                # this format can no longer read as many as the best one so far
+                if failures > len(texts) - most:
+                    break
+        else:
+            if dates:
+                parsed[fmt] = dates
+                most = max(most, len(dates))
+
+    if not parsed:
+        if texts:
+            raise ValueError(f"Unknown date format: {texts[0]!r}")
+        return None
+
+    best, *others = [fmt for fmt, dates in parsed.items() if len(dates) == most]
+    for fmt in others:
+        if parsed[fmt] == parsed[best]:
+            continue
+        if parsed[fmt].keys() != parsed[best].keys():
+            raise ValueError(f"The dates mix {best} and {fmt}; choose the statement's date format.")
+        example = min(text for text in parsed[best] if parsed[fmt][text] != parsed[best][text])
+        raise ValueError(f"Dates such as {example!r} can be read as {best} or as {fmt}; "
+                         "choose the statement's date format.")
+    return best
+
+
+@lru_cache(maxsize=8192)
+def parse_statement_date(text, date_format):
+    """Parse one statement date with the format chosen for the whole statement
+    (most lines share their date with another, so results are cached)."""
+    return datetime.strptime(text.strip(), date_format)
+
+
+def parse_import_amount(text):
+    """Parse "1,234.50", "(12.00)", "12.00 DR" or "-₹40" into a signed float, or None if blank."""
+    text = text.strip().upper()
+    if not text:
+        return None
+
+    negative = text.startswith("(") and text.endswith(")") or text.endswith("DR") or "-" in text
+    number = re.sub(r"[^\d.]", "", text)
+    if not number:
+        return None
+    value = float(number)
+    return -value if negative else value
+
+
+@lru_cache(maxsize=4096)
+def map_import_category(category, title, t_type):
+    """Pick the categories_list entry for an imported line."""
+    wanted = category.strip().lower()
+    if wanted:
+        for name in categories_list:
+            if name.split(" ")[0].lower() == wanted:
+                return name
+
+    text = f"{category} {title}".lower()
+    for name, pattern in IMPORT_CATEGORY_PATTERNS.items():
+        if pattern.search(text):
+            return name
+    return "Other ✨"
+
+
+def import_row(title, amount, when, currency, category="", t_type=None):
+    if amount is None:
+        return None
+    if t_type is None:
+        t_type = "Income" if amount > 0 else "Expense"
+    title = " ".join(title.split()) or "Imported"
+    return title, abs(amount), t_type, map_import_category(category, title, t_type), when, currency
+
+
+def guess_csv_mapping(header):
+    """Map CSV_IMPORT_FIELDS onto the statement's own column names where they match."""
+    mapping = {}
+    for field in CSV_IMPORT_FIELDS:
+        for column in header:
+            if column.strip().lower() in CSV_FIELD_ALIASES[field]:
+                mapping[field] = column
+                break
+    return mapping
+
+
+def read_csv_statement(file, mapping, currency, date_format=None):
+    """mapping names the column holding each of CSV_IMPORT_FIELDS. Either
+    "amount" (signed, or with a "type" column) or "debit"/"credit" is needed;
+    lines without a "currency" column are in `currency`. Without date_format,
+    the format is detected from the first DATE_SAMPLE_SIZE lines."""
+    reader = csv.DictReader(file)
+    sample = list(islice(reader, DATE_SAMPLE_SIZE))
+    if date_format is None and mapping.get("date"):
+        date_format = detect_date_format(record.get(mapping["date"]) for record in sample)
+
+    for record in chain(sample, reader):
+        try:
+            when = parse_statement_date(record[mapping["date"]], date_format)
+
+            if mapping.get("amount"):
+                amount = parse_import_amount(record[mapping["amount"]])
+            else:
+                debit = parse_import_amount(record[mapping["debit"]] or "")
+                credit = parse_import_amount(record[mapping["credit"]] or "")
+                amount = credit if credit else (-abs(debit) if debit else None)
+
+            t_type = None
+            if mapping.get("type") and amount is not None:
+                kind = record[mapping["type"]].strip().lower()
+                if kind in ("income", "credit", "cr", "deposit"):
+                    t_type = "Income"
+                elif kind in ("expense", "debit", "dr", "withdrawal"):
+                    t_type = "Expense"
+
+            category = record[mapping["category"]] if mapping.get("category") else ""
+            line_currency = (record[mapping["currency"]] or "").strip().upper() if mapping.get("currency") else ""
+            yield import_row(record[mapping["title"]] or "", amount, when, line_currency or currency,
+                             category or "", t_type)
+        except (KeyError, TypeError, ValueError):
+            yield None
+
+
+OFX_TAG = re.compile(r"<(/?)(\w+)>([^<\r\n]*)")
+
+
+def read_ofx_statement(file, currency):
+    """Read <STMTTRN> blocks from an OFX/QFX file (SGML or XML flavour, one
+    tag per line or all on one line), in the statement's <CURDEF> currency
+    if it names one."""
+    record = None
+    for line in file:
+        for closing, tag, value in OFX_TAG.findall(line):
+            tag = tag.upper()
+            if closing:
+                if tag != "STMTTRN" or record is None:
+                    continue
+                try:
+                    when = datetime.strptime(record["DTPOSTED"][:8], "%Y%m%d")
+                    amount = parse_import_amount(record["TRNAMT"])
+                    title = record.get("NAME") or record.get("MEMO") or ""
+                    yield import_row(title, amount, when, currency)
+                except (KeyError, ValueError):
+                    yield None
+                record = None
+            elif tag == "STMTTRN":
+                record = {}
+            elif tag == "CURDEF" and record is None and value.strip():
+                currency = value.strip().upper()
+            elif record is not None:
+                record[tag] = value.strip()
+
+
+def read_qif_records(file):
+    """Yield the ^-terminated records of a QIF file as {field letter: value}."""
+    record = {}
+    for line in file:
+        line = line.strip()
+        if not line or line.startswith("!"):
+            continue
+
+        if line != "^":
+            record.setdefault(line[0], line[1:])
+            continue
+
+        yield record
+        record = {}
+
+
+def qif_date_text(record):
+    # Quicken writes years after 1999 as 1/5'24
+    return record.get("D", "").replace("'", "/").replace(" ", "")
+
+
+def read_qif_statement(file, currency, date_format=None):
+    """Read a QIF bank statement; without date_format, the format is
+    detected from the first DATE_SAMPLE_SIZE records."""
+    records = read_qif_records(file)
+    sample = list(islice(records, DATE_SAMPLE_SIZE))
+    if date_format is None:
+        date_format = detect_date_format(qif_date_text(record) for record in sample)
+
+    for record in chain(sample, records):
+        try:
+            when = parse_statement_date(qif_date_text(record), date_format)
+            amount = parse_import_amount(record.get("T") or record.get("U") or "")
+            title = record.get("P") or record.get("M") or ""
+            yield import_row(title, amount, when, currency, record.get("L", ""))
+        except (TypeError, ValueError):
+            yield None
+
+
+def statement_format(file_path):
+    ext = os.path.splitext(file_path)[1].lower()
+    return {".ofx": "ofx", ".qfx": "ofx", ".qif": "qif"}.get(ext, "csv")
+
+
+def read_csv_header(file_path):
+    with open(file_path, newline="", encoding="utf-8-sig", errors="replace") as f:
+        return next(csv.reader(f), [])
+
+
+def import_statement(repo, file_path, mapping=None, date_format=None, progress=None, currency=None):
+    """Stream a CSV/OFX/QIF statement into the database in one transaction.
+
+    Lines are in `currency` (default: the display currency) unless the
+    statement says otherwise. progress(fraction) is called after each batch
+    with how much of the file has been read. Returns (imported, skipped)
+    line counts.
+    """
+    size = os.path.getsize(file_path) or 1
+    skipped = 0
+    currency = currency or repo.get_currency()
+
+    with open(file_path, "rb") as raw:
+        text = io.TextIOWrapper(raw, encoding="utf-8-sig", errors="replace", newline="")
+        kind = statement_format(file_path)
+        if kind == "ofx":
+            records = read_ofx_statement(text, currency)
+        elif kind == "qif":
+            records = read_qif_statement(text, currency, date_format)
+        else:
+            records = read_csv_statement(text, mapping or guess_csv_mapping(read_csv_header(file_path)),
+                                         currency, date_format)
+
+        def parsed_rows():
+            nonlocal skipped
+            for row in records:
+                if row is None:
+                    skipped += 1
+                else:
+                    yield row
+
+        on_batch = (lambda count: progress(min(raw.tell() / size, 1.0))) if progress else None
+        imported = repo.insert_transactions(parsed_rows(), on_batch=on_batch)
+
+    return imported, skipped
+
+
+# ==========================================================
+# EXCHANGE RATES
+# ==========================================================
+# Stored rates are units of a currency per one EXCHANGE_RATE_BASE, so any two
+# currencies convert through it.
+EXCHANGE_RATE_BASE = "USD"
+
+RATE_FIELD_ALIASES = {
+    "date": ("date", "day", "rate date"),
+    "currency": ("currency", "code", "ccy", "currency code"),
+    "rate": ("rate", "value", "per usd", "units per usd"),
+}
+
+
+def read_exchange_rates(file):
+    """Yield (currency, datetime, rate) from a CSV with date, currency and
+    rate columns (header names as in RATE_FIELD_ALIASES), or None for a
+    line that cannot be read."""
+    reader = csv.DictReader(file)
+    columns = {}
+    for field, aliases in RATE_FIELD_ALIASES.items():
+        for column in reader.fieldnames or ():
+            if column.strip().lower() in aliases:
+                columns[field] = column
+                break
+    if len(columns) < len(RATE_FIELD_ALIASES):
+        raise ValueError("An exchange rate file needs date, currency and rate columns.")
+
+    sample = list(islice(reader, DATE_SAMPLE_SIZE))
+    date_format = detect_date_format(record.get(columns["date"]) for record in sample)
+    for record in chain(sample, reader):
+        try:
+            when = parse_statement_date(record[columns["date"]], date_format)
+            rate = float(record[columns["rate"]])
+            currency = record[columns["currency"]].strip().upper()
+            if rate <= 0 or not currency:
+                raise ValueError
+            yield currency, when, rate
+        except (TypeError, ValueError, AttributeError):
+            yield None
+
+
+def import_exchange_rates(repo, file_path):
+    """Load an exchange rate CSV into the database. Returns (imported, skipped)."""
+    skipped = 0
+    with open(file_path, newline="", encoding="utf-8-sig", errors="replace") as f:
+        rows = []
+        for row in read_exchange_rates(f):
+            if row is None:
+                skipped += 1
+            else:
+                rows.append(row)
+    return repo.insert_exchange_rates(rows), skipped
+
+
+def build_rate_index(rows):
+    """Turn (currency, YYYYMMDD day, rate) rows into the (codes, keys, rates)
+    lookup exchange_factors() searches: one sorted int64 key per rate, the
+    currency's code in the high digits and the day in the low ones."""
+    import numpy as np
+
+    codes = {code: i for i, code in enumerate(sorted({row[0] for row in rows} | {EXCHANGE_RATE_BASE}))}
+    keys = np.array([codes[currency] * 10 ** 8 + day for currency, day, _ in rows], dtype=np.int64)
+    rates = np.array([rate for _, _, rate in rows], dtype=float)
+    order = np.argsort(keys, kind="stable")
+    return codes, keys[order], rates[order]
+
+
+def exchange_factors(index, currencies, days, target):
+    """NumPy array of factors converting an amount in currencies[i] on
+    days[i] (YYYYMMDD) into target, using a build_rate_index() lookup.
+
+    Each conversion uses the latest rate on or before the day, or the
+    earliest one after it. Amounts with no rate for their currency or the
+    target are left unconverted (factor 1).
+    """
+    import numpy as np
+
+    codes, keys, rates = index
+    days = np.array(days, dtype=np.int64)
+
+    def rates_on(code_array):
+        found = np.full(len(days), np.nan)
+        if len(keys):
+            position = np.searchsorted(keys, code_array * 10 ** 8 + days, side="right") - 1
+            before = np.clip(position, 0, len(keys) - 1)
+            after = np.clip(position + 1, 0, len(keys) - 1)
+            found = np.where((position >= 0) & (keys[before] // 10 ** 8 == code_array), rates[before],
+                             np.where(keys[after] // 10 ** 8 == code_array, rates[after], np.nan))
+        found[code_array == codes[EXCHANGE_RATE_BASE]] = 1.0
+        return found
+
+    # Currencies without any stored rate get code -1, which matches no key
+    source = np.array([codes.get(currency, -1) for currency in currencies], dtype=np.int64)
+    factors = rates_on(np.full(len(days), codes.get(target, -1), dtype=np.int64)) / rates_on(source)
+    factors[np.array([currency == target for currency in currencies], dtype=bool)] = 1.0
+    return np.where(np.isnan(factors), 1.0, factors)
+
+
+# ==========================================================
+# RECURRING TRANSACTIONS
+# ==========================================================
+# (days, months, unit) one step of each frequency advances by
+RECURRING_FREQUENCIES = {
+    "daily": (1, 0, "day"),
+    "weekly": (7, 0, "week"),
+    "monthly": (0, 1, "month"),
+    "yearly": (0, 12, "year"),
+}
+
+
+def describe_recurrence(frequency, interval):
+    """"Monthly", "Every 2 weeks", ..."""
+    if interval == 1:
+        return frequency.capitalize()
+    return f"Every {interval} {RECURRING_FREQUENCIES[frequency][2]}s"
+
+
+def add_months(when, months):
+    """when moved by whole months, on the last day of the month when the
+    target month is too short for its day (Jan 31 + 1 month = Feb 28/29)."""
+    year, month = divmod(when.year * 12 + when.month - 1 + months, 12)
+    day = min(when.day, calendar.monthrange(year, month + 1)[1])
+    return when.replace(year=year, month=month + 1, day=day)
+
+
+def recurring_occurrences(frequency, interval, start, until, after=None):
+    """Yield the datetimes a rule falls on from start through until, skipping
+    those at or before after.
+
+    Every occurrence is counted from start rather than from the previous one,
+    so a monthly rule on the 31st comes back to the 31st after February, and
+    the first step past after is found by arithmetic instead of by walking
+    from start.
+    """
+    days, months, _ = RECURRING_FREQUENCIES[frequency]
+    days, months = days * interval, months * interval
+
+    step = 0
+    if after is not None and after > start:
+        if days:
+            step = (after - start) // timedelta(days=days)
+        else:
+            step = ((after.year - start.year) * 12 + after.month - start.month) // months
+
+    while True:
+        when = start + timedelta(days=days * step) if days else add_months(start, months * step)
+        if when > until:
+            return
+        if after is None or when > after:
+            yield when
+        step += 1
+
+
+def next_occurrence(frequency, interval, start_date, end_date, after):
+    """The first datetime after `after` a rule with the stored start_date and
+    end_date falls on, or None once it has ended."""
+    until = datetime.max
+    if end_date:
+        until = datetime.strptime(end_date, "%Y-%m-%d").replace(hour=23, minute=59)
+    start = datetime.strptime(start_date, ISO_DATE_FORMAT)
+    return next(recurring_occurrences(frequency, interval, start, until, after), None)
+
+
+# ==========================================================
+# DATA EXPORT
+# ==========================================================
+# Column names of each exportable dataset, in the order the rows carry them
+EXPORT_COLUMNS = {
+    "transactions": ("id", "title", "amount", "currency", "type", "category", "date"),
+    "monthly": ("year", "month", "type", "category", "currency", "total", "tx_count"),
+    "categories": ("category", "type", "currency", "total", "tx_count"),
+}
+
+EXPORT_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".parquet": "parquet"}
+
+
+def write_csv_export(file_path, columns, chunks):
+    count = 0
+    with open(file_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for chunk in chunks:
+            writer.writerows(chunk)
+            count += len(chunk)
+    return count
+
+
+def write_jsonl_export(file_path, columns, chunks):
+    count = 0
+    with open(file_path, "w", encoding="utf-8") as f:
+        for chunk in chunks:
+            f.writelines(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n" for row in chunk)
+            count += len(chunk)
+    return count
+
+
+def write_parquet_export(file_path, columns, chunks):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow:\n\npip install pyarrow")
+
+    count = 0
+    writer = None
+    try:
+        for chunk in chunks:
+            batch = pa.table({name: list(values) for name, values in zip(columns, zip(*chunk))})
+            if writer is None:
+                writer = pq.ParquetWriter(file_path, batch.schema)
+            writer.write_table(batch)
+            count += len(chunk)
+        if writer is None:
+            pq.write_table(pa.table({name: [] for name in columns}), file_path)
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+
+def export_data(repo, file_path, dataset, search_text="", filter_type="All", sort_option="Latest"):
+    """Stream one dataset to CSV, JSON Lines or Parquet (picked by file extension).
+
+    "transactions" honours the transactions page search, filter and sort;
+    the "monthly" and "categories" totals honour the type filter. Returns
+    the number of rows written.
+    """
+    writer = {
+        "csv": write_csv_export,
+        "jsonl": write_jsonl_export,
+        "parquet": write_parquet_export,
+    }[EXPORT_FORMATS.get(os.path.splitext(file_path)[1].lower(), "csv")]
+
+    if dataset == "transactions":
+        chunks = repo.iter_transactions(search_text, filter_type, sort_option)
+    elif dataset == "monthly":
+        chunks = repo.iter_monthly_totals(filter_type)
+    else:
+        chunks = repo.iter_category_totals(filter_type)
+
+    return writer(file_path, EXPORT_COLUMNS[dataset], chunks)
+
+
+# ==========================================================
+# BACKUPS
+# ==========================================================
+AUTO_BACKUP_FOLDER = "AutoBackups"
+
+
+REQUIRED_BACKUP_COLUMNS = {
+    "transactions": {"id", "title", "amount", "type", "category", "date"},
+    "settings": {"id", "app_pin", "security_question", "security_answer", "monthly_budget"},
+}
+
+
+def validate_backup(source, schema_version):
+    """Raise ValueError unless source (an open connection) is an intact
+    PocketPlanner database this version can migrate."""
+    try:
+        version = source.execute("PRAGMA user_version").fetchone()[0]
+        problems = [row[0] for row in source.execute("PRAGMA integrity_check")]
+    except sqlite3.DatabaseError as e:
+        raise ValueError(f"Not a PocketPlanner backup: {e}")
+
+    if version > schema_version:
+        raise ValueError("This backup was made by a newer version of PocketPlanner.")
+
+    for table, required in REQUIRED_BACKUP_COLUMNS.items():
+        columns = {row[1] for row in source.execute(f"PRAGMA table_info({table})")}
+        missing = required - columns
+        if missing:
+            raise ValueError(f"Not a PocketPlanner backup: table {table} is missing "
+                             f"{', '.join(sorted(missing))}.")
+
+    if problems != ["ok"]:
+        raise ValueError("The backup file is damaged:\n\n" + "\n".join(problems[:5]))
+
+
+def list_auto_backups(folder=AUTO_BACKUP_FOLDER):
+    """Paths of the automatic backups in folder, newest first."""
+    if not os.path.isdir(folder):
+        return []
+    paths = [os.path.join(folder, name) for name in os.listdir(folder)
+             if name.startswith("backup_") and name.endswith((".db", ".db.gz"))]
+    return sorted(paths, key=os.path.getmtime, reverse=True)
+
+
+def prune_auto_backups(folder, keep, max_age_days):
+    """Delete all but the newest `keep` backups, and any older than max_age_days
+    (0 disables either limit). The newest backup is always kept."""
+    cutoff = time.time() - max_age_days * 86400
+    for i, path in enumerate(list_auto_backups(folder)):
+        if i == 0:
+            continue
+        if (keep and i >= keep) or (max_age_days and os.path.getmtime(path) < cutoff):
+            os.remove(path)
+
+
+def write_auto_backup(repo, folder=AUTO_BACKUP_FOLDER):
+    """Back up the database into folder following the auto-backup settings."""
+    keep, max_age_days, compress = repo.get_auto_backup_settings()
+    os.makedirs(folder, exist_ok=True)
+
+    time_stamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    backup_file = os.path.join(folder, f"backup_{time_stamp}.db")
+    repo.backup_to(backup_file)
+
+    if compress:
+        with open(backup_file, "rb") as src, gzip.open(backup_file + ".gz", "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.remove(backup_file)
+        backup_file += ".gz"
+
+    prune_auto_backups(folder, keep, max_age_days)
+    return backup_file
+
+
+# ==========================================================
+# PDF REPORTS
+# ==========================================================
+# (decimal places, digit grouping) per currency; INR groups in lakhs and crores
+CURRENCY_FORMATS = {
+    "INR": (2, "indian"),
+    "USD": (2, "thousands"),
+    "EUR": (2, "thousands"),
+    "GBP": (2, "thousands"),
+    "JPY": (0, "thousands"),
+}
+DEFAULT_CURRENCY_FORMAT = (2, "thousands")
+
+
+@lru_cache(maxsize=64)
+def currency_formatter(currency):
+    """A function formatting an amount in currency, e.g. "USD 1,234.50" or "JPY 1,235"."""
+    decimals, grouping = CURRENCY_FORMATS.get(currency, DEFAULT_CURRENCY_FORMAT)
+    prefix = f"{currency} "
+
+    if grouping == "thousands":
+        spec = f",.{decimals}f"
+        return lambda amount: prefix + format(amount, spec)
+
+    spec = f".{decimals}f"
+
+    def format_indian(amount):
+        text = format(amount, spec)
+        sign = "-" if text.startswith("-") else ""
+        whole, dot, fraction = text.lstrip("-").partition(".")
+        if len(whole) > 3:
+            head, tail = whole[:-3], whole[-3:]
+            groups = []
+            while len(head) > 2:
+                groups.insert(0, head[-2:])
+                head = head[:-2]
+            whole = ",".join([head] + groups + [tail])
+        return f"{prefix}{sign}{whole}{dot}{fraction}"
+
+    return format_indian
+
+
+def format_currency(currency, amount):
+    return currency_formatter(currency)(amount)
+
+
+chart_executor = None
+
+
+def chart_pool():
+    """Process pool that renders report charts (and batch reports), started on first use."""
+    global chart_executor
+    if chart_executor is None:
+        # spawn, not fork: the app process has Tk and worker threads running
+        chart_executor = ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+    return chart_executor
+
+
+def shutdown_chart_pool():
+    if chart_executor is not None:
+        chart_executor.shutdown(wait=False, cancel_futures=True)
+
+
+def render_chart_png(kind, labels, values, title, ylabel=None, figsize=(5, 3), rotation=0):
+    """Draw a "bar" or "pie" chart and return it as PNG bytes."""
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize, dpi=120)
+    ax = fig.add_subplot(111)
+    if kind == "pie":
+        ax.pie(values, labels=labels, autopct="%1.1f%%", startangle=90)
+    else:
+        ax.bar(labels, values)
+        ax.set_ylabel(ylabel)
+        if rotation:
+            ax.tick_params(axis='x', rotation=rotation)
+    ax.set_title(title)
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    return buffer.getvalue()
+
+
+def submit_chart(pool, *args, **kwargs):
+    """render_chart_png() on the pool, or right away when pool is None; returns a Future."""
+    if pool is not None:
+        return pool.submit(render_chart_png, *args, **kwargs)
+    future = Future()
+    future.set_result(render_chart_png(*args, **kwargs))
+    return future
+
+
+# (heading, x, width, right-aligned) of each column of the transactions table
+TRANSACTION_TABLE_COLUMNS = (
+    ("Title", 50, 130, False),
+    ("Amount", 185, 70, True),
+    ("Type", 265, 45, False),
+    ("Category", 315, 85, False),
+    ("Date", 400, 72, False),
+    ("Balance", 475, 75, True),
+)
+TABLE_FONT = "Helvetica"
+TABLE_FONT_SIZE = 9
+TABLE_ROW_HEIGHT = 15
+TABLE_BOTTOM = 80
+
+
+@lru_cache(maxsize=4096)
+def fit_text(text, max_width, font=TABLE_FONT, size=TABLE_FONT_SIZE):
+    """text, cut short with an ellipsis if it would be wider than max_width points."""
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+
+    if stringWidth(text, font, size) <= max_width:
+        return text
+    while text and stringWidth(text + "…", font, size) > max_width:
+        text = text[:-1]
+    return text.rstrip() + "…"
+
+
+def draw_transaction_table(c, chunks, currency, y, page_top, factors=None):
+    """Stream chunks of (title, amount, type, category, date, currency) rows into a table from y down.
+
+    Amounts are shown in their own currency; factors ({currency: factor})
+    converts them into `currency` for the per-page income and expense
+    subtotals closing every page and the running balance in the last column.
+    Page breaks repeat the header. Only one chunk is held at a time.
+    Returns (y below the table, rows drawn).
+    """
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+
+    money = currency_formatter(currency)
+    factors = factors or {}
+    columns = [(x + width if right else x, width, right) for _, x, width, right in TRANSACTION_TABLE_COLUMNS]
+    left, right_edge = columns[0][0], columns[-1][0]
+    balance = page_income = page_expense = 0
+    page = 1
+    rows = 0
+    text = None
+
+    def draw_header(y):
+        c.setFont("Helvetica-Bold", 10)
+        for heading, x, width, right in TRANSACTION_TABLE_COLUMNS:
+            if right:
+                c.drawRightString(x + width, y, heading)
+            else:
+                c.drawString(x, y, heading)
+        c.line(left, y - 4, right_edge, y - 4)
+        return y - TABLE_ROW_HEIGHT
+
+    def draw_subtotals(y):
+        # rows go into one text object per page, much cheaper than a drawString per cell
+        c.drawText(text)
+        c.line(left, y + 10, right_edge, y + 10)
+        c.setFont("Helvetica-Bold", TABLE_FONT_SIZE)
+        c.drawString(left, y, f"Page {page} subtotal  Income: {money(page_income)}  Expense: {money(page_expense)}")
+        c.drawRightString(right_edge, y, money(balance))
+        return y - 20
+
+    for chunk in chunks:
+        if text is None:
+            y = draw_header(y)
+            text = c.beginText()
+            text.setFont(TABLE_FONT, TABLE_FONT_SIZE)
+        for title, amount, ttype, category, date_str, row_currency in chunk:
+            if y < TABLE_BOTTOM:
+                draw_subtotals(y)
+                c.showPage()
+                page += 1
+                page_income = page_expense = 0
+                y = draw_header(page_top)
+                text = c.beginText()
+                text.setFont(TABLE_FONT, TABLE_FONT_SIZE)
+
+            converted = amount * factors.get(row_currency, 1.0)
+            if ttype == "Income":
+                balance += converted
+                page_income += converted
+            else:
+                balance -= converted
+                page_expense += converted
+
+            shown = money(amount) if row_currency == currency else currency_formatter(row_currency)(amount)
+            cells = (title, shown, ttype, category, date_str, money(balance))
+            for cell, (x, width, right) in zip(cells, columns):
+                if right:
+                    x -= stringWidth(cell, TABLE_FONT, TABLE_FONT_SIZE)
+                else:
+                    cell = fit_text(cell, width)
+                text.setTextOrigin(x, y)
+                text.textOut(cell)
+            y -= TABLE_ROW_HEIGHT
+            rows += 1
+
+    if rows:
+        y = draw_subtotals(y - 5)
+    return y, rows
+
+
+def draw_chart_form(c, name, placements):
+    """Define form `name` from (future, x, y, width, height) chart placements.
+
+    Reports place the form with doForm() where the charts belong and keep
+    laying out the rest of the document while the pool renders them; the
+    form is filled in here once the PNGs are ready.
+    """
+    from reportlab.lib.utils import ImageReader
+
+    c.beginForm(name)
+    for future, x, y, width, height in placements:
+        c.drawImage(ImageReader(io.BytesIO(future.result())), x, y, width=width, height=height)
+    c.endForm()
+
+
+def write_monthly_pdf_report(repo, file_path, year, month, pool=None):
+    """Render the monthly PDF report for (year, month) to file_path.
+
+    With a process pool the charts are rendered there while the pages are laid out.
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+    from reportlab.lib import colors
+
+    currency = repo.get_currency()
+    month_name = MONTH_NAMES[month - 1]
+
+    total_income = 0
+    total_expense = 0
+    category_totals = {}
+
+    for _, _, ttype, category, total in repo.period_totals(year, month):
+        if ttype == "Income":
+            total_income += total
+        else:
+            total_expense += total
+            category_totals[category] = category_totals.get(category, 0) + total
+
+    balance = total_income - total_expense
+    budget = repo.get_monthly_budget()
+
+    bar_chart = submit_chart(pool, "bar", ["Income", "Expense"], [total_income, total_expense],
+                             "Income vs Expense", "Amount")
+    pie_chart = None
+    if category_totals:
+        pie_chart = submit_chart(pool, "pie", list(category_totals.keys()), list(category_totals.values()),
+                                 "Expense Categories")
+
+    # PDF
+    c = canvas.Canvas(file_path, pagesize=A4)
+    width, height = A4
+    y = height - 60
+
+    c.setFont("Helvetica-Bold", 20)
+    c.drawString(50, y, "PocketPlanner Monthly Report")
+    y -= 30
+
+    c.setFont("Helvetica", 12)
+    c.drawString(50, y, f"Month: {month_name} {year}")
+    y -= 20
+    c.drawString(50, y, f"Generated: {datetime.now().strftime(DATE_FORMAT)}")
+    y -= 30
+
+    c.setFont("Helvetica-Bold", 13)
+    c.drawString(50, y, "Summary")
+    y -= 20
+
+    c.setFont("Helvetica", 12)
+    c.drawString(60, y, f"Total Income: {format_currency(currency, total_income)}")
+    y -= 18
+    c.drawString(60, y, f"Total Expense: {format_currency(currency, total_expense)}")
+    y -= 18
+    c.drawString(60, y, f"Balance: {format_currency(currency, balance)}")
+    y -= 18
+    c.drawString(60, y, f"Monthly Budget Set: {format_currency(currency, budget)}")
+    y -= 25
+
+    if budget > 0:
+        percent = (total_expense / budget) * 100
+
+        c.setFont("Helvetica-Bold", 12)
+        if total_expense > budget:
+            c.setFillColor(colors.red)
+            c.drawString(60, y, f"⚠ Budget Exceeded ({percent:.1f}%)")
+        else:
+            c.setFillColor(colors.green)
+            c.drawString(60, y, f"✅ Budget Safe ({percent:.1f}%)")
+
+        c.setFillColor(colors.black)
+        y -= 30
+
+    c.setFont("Helvetica-Bold", 13)
+    c.drawString(50, y, "Charts")
+    y -= 20
+
+    charts = [(bar_chart, 60, y - 200, 220, 180)]
+    if pie_chart is not None:
+        charts.append((pie_chart, 320, y - 200, 220, 180))
+    c.doForm("charts")
+
+    y -= 240
+
+    c.setFont("Helvetica-Bold", 13)
+    c.drawString(50, y, "Transactions List")
+    y -= 25
+
+    y, rows = draw_transaction_table(c, repo.iter_month_transactions(year, month), currency, y, height - 60,
+                                     repo.month_conversion_factors(year, month))
+    if not rows:
+        c.setFont("Helvetica", 12)
+        c.drawString(60, y, "No transactions found for this month.")
+        y -= 20
+
+    c.setFont("Helvetica-Oblique", 10)
+    c.drawString(50, 40, "Generated by PocketPlanner 💖")
+
+    draw_chart_form(c, "charts", charts)
+    c.save()
+
+
+def write_yearly_pdf_report(repo, file_path, year, pool=None):
+    """Render the yearly PDF report for year to file_path (charts as in the monthly report)."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    currency = repo.get_currency()
+
+    total_income = 0
+    total_expense = 0
+
+    month_data = {m: 0 for m in MONTH_NAMES}
+
+    for _, m, ttype, _, total in repo.period_totals(year):
+        if ttype == "Income":
+            total_income += total
+        else:
+            total_expense += total
+            month_data[MONTH_NAMES[m - 1]] += total
+
+    balance = total_income - total_expense
+
+    yearly_chart = submit_chart(pool, "bar", list(month_data.keys()), list(month_data.values()),
+                                "Yearly Expense Chart", "Expense", figsize=(7, 3), rotation=45)
+
+    c = canvas.Canvas(file_path, pagesize=A4)
+    width, height = A4
+    y = height - 60
+
+    c.setFont("Helvetica-Bold", 20)
+    c.drawString(50, y, "PocketPlanner Yearly Report")
+    y -= 30
+
+    c.setFont("Helvetica", 12)
+    c.drawString(50, y, f"Year: {year}")
+    y -= 20
+    c.drawString(50, y, f"Generated: {datetime.now().strftime(DATE_FORMAT)}")
+    y -= 30
+
+    c.setFont("Helvetica-Bold", 13)
+    c.drawString(50, y, "Summary")
+    y -= 20
+
+    c.setFont("Helvetica", 12)
+    c.drawString(60, y, f"Total Income: {format_currency(currency, total_income)}")
+    y -= 18
+    c.drawString(60, y, f"Total Expense: {format_currency(currency, total_expense)}")
+    y -= 18
+    c.drawString(60, y, f"Balance: {format_currency(currency, balance)}")
+    y -= 30
+
+    c.setFont("Helvetica-Bold", 13)
+    c.drawString(50, y, "Yearly Expense Chart")
+    y -= 20
+
+    charts = [(yearly_chart, 70, y - 220, 460, 200)]
+    c.doForm("charts")
+
+    y -= 250
+
+    c.setFont("Helvetica-Bold", 13)
+    c.drawString(50, y, "Month Wise Expense")
+    y -= 20
+
+    c.setFont("Helvetica", 11)
+    for m, v in month_data.items():
+        if y < 80:
+            c.showPage()
+            y = height - 60
+
+        c.drawString(70, y, f"{m}: {format_currency(currency, v)}")
+        y -= 15
+
+    c.setFont("Helvetica-Oblique", 10)
+    c.drawString(50, 40, "Generated by PocketPlanner 💖")
+
+    draw_chart_form(c, "charts", charts)
+    c.save()
+
+
+def monthly_pdf_report_name(year, month):
+    return f"PocketPlanner_Monthly_Report_{MONTH_NAMES[month - 1]}_{year}.pdf"
+
+
+def write_monthly_pdf_in_process(db_path, profile, file_path, year, month):
+    """Pool entry point: one monthly report on the process's own connection."""
+    repo = BudgetRepository(db_path, profile)
+    try:
+        write_monthly_pdf_report(repo, file_path, year, month)
+    finally:
+        repo.close()
+
+
+def write_monthly_pdf_reports(repo, folder, year, pool=None):
+    """Write the twelve monthly reports of `year` into folder, one pool
+    process per report when a pool is given. Returns the file paths."""
+    paths = [os.path.join(folder, monthly_pdf_report_name(year, month)) for month in range(1, 13)]
+
+    if pool is None:
+        for month, path in enumerate(paths, start=1):
+            write_monthly_pdf_report(repo, path, year, month)
+        return paths
+
+    futures = [pool.submit(write_monthly_pdf_in_process, repo.path, repo.profile, path, year, month)
+               for month, path in enumerate(paths, start=1)]
+    for future in futures:
+        future.result()
+    return paths
+
+
+# ==========================================================
+# BACKGROUND WORKER
+# ==========================================================
+class BackgroundWorker:
+    """Runs slow queries and exports on one worker thread, which has its own
+    BudgetRepository, and hands the results back to the Tk thread.
+
+    Jobs are submitted on a named channel. Submitting again on the same
+    channel, or cancelling it, makes any result still in flight stale: it
+    is dropped instead of being delivered.
+    """
+
+    POLL_MS = 30
+
+    def __init__(self, root, repo):
+        self.root = root
+        self.repo = repo
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pocketplanner-worker")
+        self.results = queue.Queue()
+        self.local = threading.local()
+        self.generations = {}
+        self.futures = {}
+        self.poll()
+
+    def repository(self):
+        if getattr(self.local, "repo", None) is None:
+            self.local.repo = self.repo.clone()
+        # The UI's connection may have changed settings since the last job.
+        # The app imports rates and restores backups through jobs run here,
+        # which reset this repository's rate caches themselves.
+        self.local.repo.invalidate_settings_cache()
+        return self.local.repo
+
+    def submit(self, channel, job, on_done, on_error=None, on_progress=None):
+        """Run job(repository) off the UI thread, then on_done(result) (or
+        on_error(exception)) back on the UI thread.
+
+        With on_progress the job is called as job(repository, progress), and
+        each progress(value) it makes runs on_progress(value) on the UI thread.
+        """
+        self.cancel(channel)
+        generation = self.generations.get(channel, 0) + 1
+        self.generations[channel] = generation
+
+        def progress(value):
+            self.results.put((channel, generation, on_progress, value))
+
+        def run():
+            try:
+                if on_progress is None:
+                    result = job(self.repository())
+                else:
+                    result = job(self.repository(), progress)
+            except Exception as e:
+                self.results.put((channel, generation, on_error, e))
+            else:
+                self.results.put((channel, generation, on_done, result))
+
+        self.futures[channel] = self.executor.submit(run)
+
+    def cancel(self, prefix):
+        """Drop pending and in-flight results of every channel starting with prefix."""
+        for channel in list(self.generations):
+            if channel.startswith(prefix):
+                self.generations[channel] += 1
+                future = self.futures.pop(channel, None)
+                if future is not None:
+                    future.cancel()
+
+    def poll(self):
+        try:
+            while True:
+                try:
+                    channel, generation, callback, value = self.results.get_nowait()
+                except queue.Empty:
+                    break
+
+                if generation == self.generations.get(channel) and callback is not None:
+                    # one failing callback must not strand the results queued behind it
+                    try:
+                        callback(value)
+                    except Exception:
+                        self.root.report_callback_exception(*sys.exc_info())
+        finally:
+            self.root.after(self.POLL_MS, self.poll)
+
+    def close_repository(self):
+        if getattr(self.local, "repo", None) is not None:
+            self.local.repo.close()
+            self.local.repo = None
+
+    def shutdown(self):
+        """Drop queued jobs and close the worker's connection once the running job is done."""
+        for future in self.futures.values():
+            future.cancel()
+        self.executor.submit(self.close_repository)
+        self.executor.shutdown(wait=False)
+
+
+# ==========================================================
+# VIRTUAL TABLE
+# ==========================================================
+class VirtualTable:
+    """A Treeview that only ever holds the rows currently on screen.
+
+    The rows are read on the background worker. query() runs on the UI
+    thread and returns the parameters of the current result set (search
+    text, filters...); count_rows(repo, params) returns how many rows there
+    are in total and fetch_rows(repo, params, limit, offset) returns rows
+    whose first value is a unique id, both run on the worker. Rows are read
+    in blocks around the visible window, so scrolling through a huge result
+    set keeps the widget (and memory) the size of one screen.
+    """
+
+    ROW_HEIGHT = 30    # matches the Treeview rowheight in setup_styles
+    BLOCK_SIZE = 200   # rows fetched per database round trip
+
+    def __init__(self, parent, columns, worker, channel, query, fetch_rows, count_rows, bg, on_error=None):
+        self.worker = worker
+        self.channel = channel
+        self.query = query
+        self.fetch_rows = fetch_rows
+        self.count_rows = count_rows
+        self.on_error = on_error
+
+        self.offset = 0
+        self.total = 0
+        self.visible = 15
+        self.selected_id = None
+
+        self.params = None          # parameters the block and total were read with
+        self.block_offset = 0
+        self.block = []
+        self.loading_offset = None  # block_offset of the block being read, if any
+
+        self.frame = tk.Frame(parent, bg=bg)
+
+        self.tree = ttk.Treeview(self.frame, columns=columns, show="headings",
+                                 height=self.visible, selectmode="browse")
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.on_scrollbar)
+
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<MouseWheel>", self.on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_by(3))
+        self.tree.bind("<Up>", lambda e: self.move_selection(-1))
+        self.tree.bind("<Down>", lambda e: self.move_selection(1))
+        self.tree.bind("<Prior>", lambda e: self.scroll_by(-self.visible))
+        self.tree.bind("<Next>", lambda e: self.scroll_by(self.visible))
+        self.tree.bind("<Home>", lambda e: self.scroll_to(0))
+        self.tree.bind("<End>", lambda e: self.scroll_to(self.total))
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    # ---------------- DATA ---------------- #
+    def refresh(self, reset=False, on_done=None):
+        """Re-count and redraw; reset jumps back to the top and drops the selection.
+        on_done() runs once the new total and rows are on screen."""
+        if reset:
+            self.offset = 0
+            self.selected_id = None
+
+        params = self.query()
+        fetch_rows, count_rows = self.fetch_rows, self.count_rows
+        offset, visible = self.offset, self.visible
+
+        def job(repo):
+            total = count_rows(repo, params)
+            block_offset = self.block_start(max(0, min(offset, total - visible)), visible)
+            return total, block_offset, fetch_rows(repo, params, self.BLOCK_SIZE, block_offset)
+
+        def loaded(result):
+            self.params = params
+            self.total, self.block_offset, self.block = result
+            self.loading_offset = None
+            self.render()
+            if on_done is not None:
+                on_done()
+
+        self.worker.submit(self.channel + ":count", job, loaded, self.on_error)
+
+    def block_start(self, offset, visible):
+        # centre the block on the window so scrolling either way stays in memory
+        return max(0, offset - (self.BLOCK_SIZE - visible) // 2)
+
+    def load_block(self):
+        """Read the block around the current window on the worker, then redraw."""
+        block_offset = self.block_start(self.offset, self.visible)
+        if block_offset == self.loading_offset:
+            return
+        self.loading_offset = block_offset
+        params, fetch_rows = self.params, self.fetch_rows
+
+        def loaded(rows):
+            if params is not self.params:
+                return  # a refresh replaced the result set meanwhile
+            self.block_offset, self.block = block_offset, rows
+            self.loading_offset = None
+            self.render()
+
+        def failed(error):
+            self.loading_offset = None
+            if self.on_error is not None:
+                self.on_error(error)
+
+        self.worker.submit(self.channel + ":rows",
+                           lambda repo: fetch_rows(repo, params, self.BLOCK_SIZE, block_offset),
+                           loaded, failed)
+
+    def window_rows(self):
+        """Rows of the visible window, or None while their block is still being read."""
+        if self.params is None:
+            return None  # the first refresh has not come back yet
+
+        end = self.offset + self.visible
+        block_end = self.block_offset + len(self.block)
+
+        in_block = self.block_offset <= self.offset and (end <= block_end or block_end >= self.total)
+        if not in_block:
+            self.load_block()
+            return None
+
+        start = self.offset - self.block_offset
+        return self.block[start:start + self.visible]
+
+    def render(self):
+        self.offset = max(0, min(self.offset, self.total - self.visible))
+        rows = self.window_rows()
+
+        if rows is not None:
+            # while a block is read the previous rows stay up instead of a blank table
+            self.tree.delete(*self.tree.get_children())
+            for row in rows:
+                self.tree.insert("", tk.END, iid=str(row[0]), values=row)
+
+            if self.selected_id is not None and self.tree.exists(str(self.selected_id)):
+                self.tree.selection_set(str(self.selected_id))
+                self.tree.focus(str(self.selected_id))
+        else:
+            rows = self.tree.get_children()
+
+        if self.total:
+            self.scrollbar.set(self.offset / self.total,
+                               min(1.0, (self.offset + len(rows)) / self.total))
+        else:
+            self.scrollbar.set(0, 1)
+
+    # ---------------- SCROLLING ---------------- #
+    def scroll_to(self, offset):
+        self.offset = offset
+        self.render()
+        return "break"
+
+    def scroll_by(self, rows):
+        return self.scroll_to(self.offset + rows)
+
+    def on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(value) * self.total))
+        elif action == "scroll":
+            step = self.visible if unit == "pages" else 1
+            self.scroll_by(int(value) * step)
+
+    def on_mousewheel(self, event):
+        return self.scroll_by(-3 if event.delta > 0 else 3)
+
+    def on_resize(self, event):
+        visible = max(1, (event.height - self.ROW_HEIGHT) // self.ROW_HEIGHT)
+        if visible != self.visible:
+            self.visible = visible
+            self.render()
+
+    # ---------------- SELECTION ---------------- #
+    def on_select(self, event=None):
+        selection = self.tree.selection()
+        if selection:
+            self.selected_id = int(selection[0])
+
+    def move_selection(self, step):
+        children = self.tree.get_children()
+        if not children:
+            return "break"
+
+        current = str(self.selected_id)
+        index = children.index(current) + step if current in children else 0
+
+        if index < 0:
+            self.scroll_by(-1)
+            index = 0
+        elif index >= len(children):
+            self.scroll_by(1)
+            index = len(children) - 1
+
+        children = self.tree.get_children()
+        if children:
+            self.selected_id = int(children[index])
+            self.tree.selection_set(children[index])
+            self.tree.focus(children[index])
+        return "break"
+
+
 # ==========================================================
 # MAIN APP
 # ==========================================================
 class BudgetApp:
-    def __init__(self, root):
+    def __init__(self, root, repo):
         self.root = root
+        self.repo = repo
         self.root.title("PocketPlanner✨💖")
         self.root.geometry("1350x760")
         self.root.minsize(1250, 700)
@@ -163,6 +2497,31 @@ class BudgetApp:
         self.is_dark = False
         self.active_btn = None
 
+        # bumped by every write; pages and figures built for an older
+        # version are rebuilt, everything else is reused as-is
+        self.data_version = 0
+        self.dashboard_cache = {}
+        self.page_cache = {}
+        self.report_charts = {}
+        self.report_rendered = {}
+        self.budget_warned_version = None
+
+        self.worker = BackgroundWorker(self.root, self.repo)
+        self.backup_marker = self.repo.change_marker()
+        self.status_var = tk.StringVar(value="")
+
+        # statements being imported; the worker holds the write lock meanwhile
+        self.running_imports = set()
+        self.root.report_callback_exception = self.report_callback_exception
+
+        # Recurring transactions that fell due while the app was closed. Queued
+        # ahead of the first dashboard load, and after backup_marker so that
+        # they count as a change for the auto-backup on exit.
+        self.worker.submit("recurring", lambda repo: repo.materialize_recurring(),
+                           self.recurring_materialized,
+                           lambda error: messagebox.showerror(
+                               "Recurring Transactions", f"Could not create due recurring transactions:\n\n{error}"))
+
         self.setup_styles()
         self.setup_ui()
         self.show_dashboard()
@@ -202,22 +2561,52 @@ class BudgetApp:
                         font=("Segoe UI", 11, "bold"),
                         padding=[10, 6])
 
+    # ---------------- WRITE LOCK ---------------- #
+    def import_running(self):
+        """Warn and return True while a statement import is being written;
+        a write from the UI would wait for its lock and then fail."""
+        if not self.running_imports:
+            return False
+        messagebox.showwarning("Import Running",
+                               "A statement import is still being saved.\n\nTry again when it has finished.")
+        return True
+
+    def report_callback_exception(self, exc_type, exc, tb):
+        """Tk's handler for errors raised in callbacks. A write that timed out
+        behind the worker's lock is reported instead of only being printed."""
+        if isinstance(exc, sqlite3.OperationalError) and "locked" in str(exc):
+            if self.repo.transaction_depth == 0 and self.repo.conn.in_transaction:
+                self.repo.conn.rollback()
+            messagebox.showwarning("Database Busy",
+                                   "PocketPlanner is still saving in the background, so this change "
+                                   "was not made.\n\nTry again in a moment.")
+            return
+        tk.Tk.report_callback_exception(self.root, exc_type, exc, tb)
+
     # ---------------- CURRENCY ---------------- #
     def get_currency(self):
-        cursor.execute("SELECT currency FROM settings WHERE id=1")
-        cur = cursor.fetchone()[0]
-        return cur if cur else "INR"
+        return self.repo.get_currency()
 
     def set_currency(self, value):
-        cursor.execute("UPDATE settings SET currency=? WHERE id=1", (value,))
-        conn.commit()
+        self.repo.set_settings(currency=value)
+        self.mark_data_changed()
 
     def format_money(self, amount):
-        cur = self.get_currency()
-        return f"{cur} {amount:.2f}"
+        return format_currency(self.get_currency(), amount)
+
+    def show_missing_rates(self, parent, missing_rates):
+        """Warn that totals include amounts in currencies without any exchange rate."""
+        if missing_rates:
+            tk.Label(parent,
+                     text=f"⚠ No exchange rates for {', '.join(missing_rates)}; "
+                          "those amounts are counted unconverted in the totals",
+                     bg=self.theme["BG"], fg=self.theme["DANGER"],
+                     font=("Segoe UI", 10, "bold")).pack(pady=5)
 
     # ---------------- AUTO BACKUP ON EXIT ---------------- #
     def on_close(self):
+        self.worker.shutdown()
+        shutdown_chart_pool()
         try:
             self.auto_backup()
         except:
@@ -225,26 +2614,19 @@ class BudgetApp:
         self.root.destroy()
 
     def auto_backup(self):
-        if not os.path.exists(DB_PATH):
+        """Back up on exit, unless nothing was written since the app opened
+        (backup_marker is None after a restore)."""
+        if self.repo.change_marker() == self.backup_marker:
             return
-
-        backup_folder = "AutoBackups"
-        os.makedirs(backup_folder, exist_ok=True)
-
-        time_stamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        backup_file = os.path.join(backup_folder, f"backup_{time_stamp}.db")
-
-        shutil.copy(DB_PATH, backup_file)
+        write_auto_backup(self.repo)
 
     # ---------------- SETTINGS HELPERS ---------------- #
     def get_monthly_budget(self):
-        cursor.execute("SELECT monthly_budget FROM settings WHERE id=1")
-        budget = cursor.fetchone()[0]
-        return budget if budget else 0
+        return self.repo.get_monthly_budget()
 
     def set_monthly_budget(self, value):
-        cursor.execute("UPDATE settings SET monthly_budget=? WHERE id=1", (value,))
-        conn.commit()
+        self.repo.set_settings(monthly_budget=value)
+        self.mark_data_changed()
 
     # ---------------- UI SETUP ---------------- #
     def setup_ui(self):
@@ -286,6 +2668,10 @@ class BudgetApp:
                   relief="flat", font=("Segoe UI", 10, "bold"),
                   padx=12, pady=6).pack(side="right", padx=20)
 
+        tk.Label(self.header, textvariable=self.status_var,
+                 font=("Segoe UI", 10, "bold"),
+                 bg=self.theme["HEADER"], fg=self.theme["MUTED"]).pack(side="right", padx=10)
+
         # SIDEBAR LOGO
         tk.Label(self.sidebar, text="💰", font=("Segoe UI", 40, "bold"),
                  bg=self.theme["SIDEBAR"], fg=self.theme["TEXT"]).pack(pady=15)
@@ -302,6 +2688,7 @@ class BudgetApp:
         self.btn_dashboard = self.make_sidebar_button("🏠 Dashboard", self.show_dashboard)
         self.btn_add = self.make_sidebar_button("➕ Add Transaction", self.show_add_page)
         self.btn_trans = self.make_sidebar_button("📜 Transactions", self.show_transactions_page)
+        self.btn_recurring = self.make_sidebar_button("🔁 Recurring", self.show_recurring_page)
         self.btn_reports = self.make_sidebar_button("📊 Reports", self.show_reports_page)
         self.btn_settings = self.make_sidebar_button("⚙ Settings", self.show_settings_page)
 
@@ -350,8 +2737,51 @@ class BudgetApp:
         command()
 
     def clear_content(self):
+        self.worker.cancel("page:")
+
+        cached = {frame for _, frame in self.page_cache.values()}
         for widget in self.content_frame.winfo_children():
-            widget.destroy()
+            if widget in cached:
+                widget.pack_forget()
+            else:
+                widget.destroy()
+
+    def show_loading(self, text):
+        self.clear_content()
+        label = tk.Label(self.content_frame, text=text,
+                         font=("Segoe UI", 16, "bold"),
+                         bg=self.theme["BG"], fg=self.theme["MUTED"])
+        label.pack(pady=80)
+        return label
+
+    def set_status(self, text):
+        self.status_var.set(text)
+
+    # ---------------- PAGE / DATA CACHE ---------------- #
+    def mark_data_changed(self):
+        """Call after every write so cached pages and figures get rebuilt."""
+        self.data_version += 1
+
+    def show_cached_page(self, name, build, data_bound=True):
+        """Re-pack the page if it was built for the current theme (and data
+        version, when data_bound), otherwise build it again into a fresh
+        frame. Returns True when the page was (re)built."""
+        self.clear_content()
+
+        key = (self.data_version if data_bound else None, self.is_dark)
+        cached = self.page_cache.get(name)
+        if cached and cached[0] == key:
+            cached[1].pack(fill="both", expand=True)
+            return False
+
+        if cached:
+            cached[1].destroy()
+
+        page = tk.Frame(self.content_frame, bg=self.theme["BG"])
+        page.pack(fill="both", expand=True)
+        self.page_cache[name] = (key, page)
+        build(page)
+        return True
 
     # ---------------- THEME SWITCH ---------------- #
     def toggle_theme(self):
@@ -360,6 +2790,9 @@ class BudgetApp:
 
         for widget in self.root.winfo_children():
             widget.destroy()
+        self.page_cache = {}
+        self.report_charts = {}
+        self.report_rendered = {}
 
         self.setup_styles()
         self.setup_ui()
@@ -374,66 +2807,61 @@ class BudgetApp:
             messagebox.showinfo("Search", "Type something to search!")
             return
 
-        cursor.execute("SELECT * FROM transactions")
-        rows = cursor.fetchall()
+        def searched():
+            if self.trans_table.total == 0:
+                messagebox.showinfo("No Results", "No matching transactions found.")
 
-        matches = []
-        for row in rows:
-            rid, title, amount, ttype, category, date = row
-            combined = f"{rid} {title} {amount} {ttype} {category} {date}".lower()
-            if text in combined:
-                matches.append(row)
-
-        if not matches:
-            messagebox.showinfo("No Results", "No matching transactions found.")
-            return
-
-        self.show_transactions_page()
-        self.search_var.set(text)
-        self.refresh_transactions_table()
+        self.show_transactions_page(text, on_loaded=searched)
 
     # ---------------- DATABASE HELPERS ---------------- #
-    def fetch_summary(self):
-        cursor.execute("SELECT SUM(amount) FROM transactions WHERE type='Income'")
-        income = cursor.fetchone()[0] or 0
+    def load_in_background(self, channel, job, on_done, placeholder=None):
+        """Run a page query on the worker; cancelled when the user navigates away.
+        If it fails, the error replaces the placeholder label's "Loading..."
+        (or is shown in a message box when there is none left)."""
+        def failed(error):
+            if placeholder is not None and placeholder.winfo_exists():
+                placeholder.config(text=f"Could not load this page:\n\n{error}",
+                                   fg=self.theme["DANGER"], wraplength=600)
+            else:
+                messagebox.showerror("Loading Failed", str(error))
 
-        cursor.execute("SELECT SUM(amount) FROM transactions WHERE type='Expense'")
-        expense = cursor.fetchone()[0] or 0
+        self.worker.submit("page:" + channel, job, on_done, failed)
 
-        balance = income - expense
-        return income, expense, balance
+    # ---------------- DASHBOARD ---------------- #
+    def show_dashboard(self):
+        if self.dashboard_cache.get("version") == self.data_version:
+            self.show_cached_page("dashboard", self.build_dashboard)
+            return
 
-    def fetch_month_expense(self):
-        current_month = datetime.now().strftime("%m-%Y")
+        # dashboard figures are out of date: load them off the UI thread
+        placeholder = self.show_loading("Loading dashboard...")
+        version = self.data_version
 
-        cursor.execute("SELECT amount, date FROM transactions WHERE type='Expense'")
-        rows = cursor.fetchall()
+        def loaded(data):
+            data["version"] = version
+            data["figures"] = {}
+            self.dashboard_cache = data
+            self.show_dashboard()
 
-        total = 0
-        for amount, date_str in rows:
-            trans_month = datetime.strptime(date_str, "%d-%m-%Y %H:%M").strftime("%m-%Y")
-            if trans_month == current_month:
-                total += amount
+        self.load_in_background("dashboard", BudgetRepository.dashboard_data, loaded, placeholder)
 
-        return total
+    def dashboard_figure(self, name, build):
+        figures = self.dashboard_cache["figures"]
+        if name not in figures:
+            figures[name] = build()
+        return figures[name]
 
-    def get_category_summary(self):
-        cursor.execute("SELECT category, SUM(amount) FROM transactions WHERE type='Expense' GROUP BY category")
-        rows = cursor.fetchall()
-        rows.sort(key=lambda x: x[1], reverse=True)
-        return rows
+    def build_dashboard(self, page):
+        data = self.dashboard_cache
 
-    # ---------------- DASHBOARD ---------------- #
-    def show_dashboard(self):
-        self.clear_content()
-
-        tk.Label(self.content_frame, text="Dashboard ✨",
+        tk.Label(page, text="Dashboard ✨",
                  font=("Segoe UI", 24, "bold"),
                  bg=self.theme["BG"], fg=self.theme["TEXT"]).pack(anchor="w", padx=25, pady=15)
 
-        income, expense, balance = self.fetch_summary()
+        income, expense, balance = data["summary"]
+        self.show_missing_rates(page, data["missing_rates"])
 
-        cards_frame = tk.Frame(self.content_frame, bg=self.theme["BG"])
+        cards_frame = tk.Frame(page, bg=self.theme["BG"])
         cards_frame.pack(fill="x", padx=25)
 
         self.make_card(cards_frame, "💚 Total Income", self.format_money(income), self.theme["ACCENT"])
@@ -441,11 +2869,11 @@ class BudgetApp:
         self.make_card(cards_frame, "💰 Balance", self.format_money(balance), self.theme["PURPLE"])
 
         # MONTHLY BUDGET
-        budget = self.get_monthly_budget()
-        month_exp = self.fetch_month_expense()
+        budget = data["budget"]
+        month_exp = data["month_expense"]
 
         percent = 0
-        budget_card = tk.Frame(self.content_frame, bg=self.theme["CARD"],
+        budget_card = tk.Frame(page, bg=self.theme["CARD"],
                                highlightbackground=self.theme["BORDER"], highlightthickness=2)
         budget_card.pack(fill="x", padx=25, pady=15)
 
@@ -470,12 +2898,14 @@ class BudgetApp:
         pb.pack(padx=15, pady=12)
         pb["value"] = percent
 
-        if budget > 0 and month_exp > budget:
+        # warn once per data change, not on every theme switch or revisit
+        if budget > 0 and month_exp > budget and self.budget_warned_version != self.data_version:
+            self.budget_warned_version = self.data_version
             messagebox.showwarning("⚠ Budget Exceeded!",
                                    f"You exceeded your monthly budget!\n\nBudget: {self.format_money(budget)}\nSpent: {self.format_money(month_exp)}")
 
         # CHARTS GRID
-        charts_grid = tk.Frame(self.content_frame, bg=self.theme["BG"])
+        charts_grid = tk.Frame(page, bg=self.theme["BG"])
         charts_grid.pack(fill="both", expand=True, padx=25, pady=10)
 
         # LEFT CHART (BAR)
@@ -504,10 +2934,10 @@ class BudgetApp:
         pie_container = tk.Frame(pie_card, bg=self.theme["CARD"])
         pie_container.pack(fill="both", expand=True)
 
-        self.draw_dashboard_pie(pie_container)
+        self.draw_dashboard_pie(pie_container, data["categories"])
 
         # CATEGORY SUMMARY
-        summary_card = tk.Frame(self.content_frame, bg=self.theme["CARD"],
+        summary_card = tk.Frame(page, bg=self.theme["CARD"],
                                 highlightbackground=self.theme["BORDER"], highlightthickness=2)
         summary_card.pack(fill="x", padx=25, pady=15)
 
@@ -515,7 +2945,7 @@ class BudgetApp:
                  font=("Segoe UI", 13, "bold"),
                  bg=self.theme["CARD"], fg=self.theme["TEXT"]).pack(anchor="w", padx=15, pady=10)
 
-        summary_data = self.get_category_summary()
+        summary_data = data["categories"]
 
         if not summary_data:
             tk.Label(summary_card, text="No Expense Data Found!",
@@ -541,41 +2971,52 @@ class BudgetApp:
                  bg=self.theme["CARD"], fg=color).pack(anchor="w", padx=15, pady=5)
 
     def draw_income_expense_chart(self, frame, income, expense):
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+
         for widget in frame.winfo_children():
             widget.destroy()
 
-        fig = Figure(figsize=(5, 3), dpi=100)
-        ax = fig.add_subplot(111)
+        def build():
+            fig = Figure(figsize=(5, 3), dpi=100)
+            ax = fig.add_subplot(111)
 
-        ax.bar(["Income", "Expense"], [income, expense])
-        ax.set_title("Income vs Expense")
-        ax.set_ylabel("Amount")
+            ax.bar(["Income", "Expense"], [income, expense])
+            ax.set_title("Income vs Expense")
+            ax.set_ylabel("Amount")
+            return fig
+
+        fig = self.dashboard_figure("income_expense", build)
 
         canvas = FigureCanvasTkAgg(fig, master=frame)
         canvas.draw()
         canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
 
-    def draw_dashboard_pie(self, frame):
+    def draw_dashboard_pie(self, frame, rows):
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+
         for widget in frame.winfo_children():
             widget.destroy()
 
-        cursor.execute("SELECT category, SUM(amount) FROM transactions WHERE type='Expense' GROUP BY category")
-        rows = cursor.fetchall()
-
         if not rows:
             tk.Label(frame, text="No Expense Data!",
                      font=("Segoe UI", 12, "bold"),
                      bg=self.theme["CARD"], fg=self.theme["MUTED"]).pack(pady=50)
             return
 
-        labels = [r[0] for r in rows]
-        values = [r[1] for r in rows]
+        def build():
+            labels = [r[0] for r in rows]
+            values = [r[1] for r in rows]
 
-        fig = Figure(figsize=(5, 3), dpi=100)
-        ax = fig.add_subplot(111)
+            fig = Figure(figsize=(5, 3), dpi=100)
+            ax = fig.add_subplot(111)
 
-        ax.pie(values, labels=labels, autopct="%1.1f%%", startangle=90)
-        ax.set_title("Expense Pie Chart")
+            ax.pie(values, labels=labels, autopct="%1.1f%%", startangle=90)
+            ax.set_title("Expense Pie Chart")
+            return fig
+
+        fig = self.dashboard_figure("expense_pie", build)
 
         canvas = FigureCanvasTkAgg(fig, master=frame)
         canvas.draw()
@@ -623,6 +3064,34 @@ class BudgetApp:
         ttk.Combobox(card, textvariable=self.category_var,
                      values=categories_list, width=29).grid(row=3, column=1, padx=10)
 
+        tk.Label(card, text="Currency",
+                 bg=self.theme["CARD"], fg=self.theme["MUTED"],
+                 font=("Segoe UI", 11, "bold")).grid(row=4, column=0, padx=20, pady=15)
+
+        self.currency_var = tk.StringVar(value=self.get_currency())
+        ttk.Combobox(card, textvariable=self.currency_var,
+                     values=list(CURRENCY_FORMATS), width=29).grid(row=4, column=1, padx=10)
+
+        tk.Label(card, text="Repeat",
+                 bg=self.theme["CARD"], fg=self.theme["MUTED"],
+                 font=("Segoe UI", 11, "bold")).grid(row=5, column=0, padx=20, pady=15)
+
+        self.repeat_var = tk.StringVar(value="Never")
+        ttk.Combobox(card, textvariable=self.repeat_var,
+                     values=["Never"] + [f.capitalize() for f in RECURRING_FREQUENCIES],
+                     width=29, state="readonly").grid(row=5, column=1, padx=10)
+
+        tk.Label(card, text="Repeat Until",
+                 bg=self.theme["CARD"], fg=self.theme["MUTED"],
+                 font=("Segoe UI", 11, "bold")).grid(row=6, column=0, padx=20, pady=15)
+
+        self.repeat_until_entry = tk.Entry(card, width=32, font=("Segoe UI", 12))
+        self.repeat_until_entry.grid(row=6, column=1, padx=10)
+
+        tk.Label(card, text="DD-MM-YYYY, blank = no end",
+                 bg=self.theme["CARD"], fg=self.theme["MUTED"],
+                 font=("Segoe UI", 9)).grid(row=6, column=2, padx=10, sticky="w")
+
         tk.Button(self.content_frame, text="✨ Save Transaction",
                   command=self.add_transaction,
                   bg=self.theme["ACCENT"], fg="white",
@@ -636,6 +3105,10 @@ class BudgetApp:
         amount = self.amount_entry.get().strip()
         t_type = self.type_var.get()
         category = self.category_var.get()
+        currency = self.currency_var.get().strip().upper() or self.get_currency()
+
+        if self.import_running():
+            return
 
         if title == "" or amount == "":
             messagebox.showerror("Error", "Please fill all fields!")
@@ -647,25 +3120,41 @@ class BudgetApp:
             messagebox.showerror("Error", "Amount must be a number!")
             return
 
-        date = datetime.now().strftime("%d-%m-%Y %H:%M")
-
-        cursor.execute("""
-            INSERT INTO transactions (title, amount, type, category, date)
-            VALUES (?, ?, ?, ?, ?)
-        """, (title, amount, t_type, category, date))
+        repeat = self.repeat_var.get().lower()
+        if repeat in RECURRING_FREQUENCIES:
+            until = self.repeat_until_entry.get().strip()
+            try:
+                end = parse_import_date(until, "%d-%m-%Y")[0] if until else None
+            except ValueError:
+                messagebox.showerror("Error", "Repeat Until must be a date like 31-12-2025!")
+                return
 
-        conn.commit()
-        messagebox.showinfo("Saved ✨", "Transaction Added Successfully!")
+            # today's occurrence is the transaction being added
+            try:
+                self.repo.add_recurring_rule(title, amount, t_type, category, currency, repeat, end=end)
+            except ValueError as e:
+                messagebox.showerror("Error", f"Repeat Until: {e}!")
+                return
+            self.repo.materialize_recurring()
+            self.mark_data_changed()
+            messagebox.showinfo("Saved ✨", f"Transaction Added! It repeats {repeat} from now on.")
+        else:
+            self.repo.add_transaction(title, amount, t_type, category, currency=currency)
+            self.mark_data_changed()
+            messagebox.showinfo("Saved ✨", "Transaction Added Successfully!")
 
         # stay in add page
         self.title_entry.delete(0, tk.END)
         self.amount_entry.delete(0, tk.END)
         self.type_var.set("Expense")
         self.category_var.set("Other ✨")
+        self.repeat_var.set("Never")
+        self.repeat_until_entry.delete(0, tk.END)
         self.title_entry.focus_set()
 
     # ---------------- TRANSACTIONS PAGE ---------------- #
-    def show_transactions_page(self):
+    def show_transactions_page(self, search="", on_loaded=None):
+        """on_loaded() runs once the first page of the (searched) list is shown."""
         self.clear_content()
 
         tk.Label(self.content_frame, text="Transactions 📜",
@@ -679,7 +3168,7 @@ class BudgetApp:
                  bg=self.theme["BG"], fg=self.theme["TEXT"],
                  font=("Segoe UI", 11, "bold")).pack(side="left")
 
-        self.search_var = tk.StringVar()
+        self.search_var = tk.StringVar(value=search)
         tk.Entry(top_bar, textvariable=self.search_var,
                  font=("Segoe UI", 11), width=25).pack(side="left", padx=10)
 
@@ -695,12 +3184,13 @@ class BudgetApp:
                  bg=self.theme["BG"], fg=self.theme["TEXT"],
                  font=("Segoe UI", 11, "bold")).pack(side="left", padx=5)
 
-        self.sort_var = tk.StringVar(value="Latest")
+        relevance = self.repo.fts_enabled and fts_match_expression(search)
+        self.sort_var = tk.StringVar(value="Relevance" if relevance else "Latest")
         ttk.Combobox(top_bar, textvariable=self.sort_var,
-                     values=["Latest", "Oldest", "Highest", "Lowest"], width=12).pack(side="left", padx=5)
+                     values=["Latest", "Oldest", "Highest", "Lowest", "Relevance"], width=12).pack(side="left", padx=5)
 
         tk.Button(top_bar, text="Apply",
-                  command=self.refresh_transactions_table,
+                  command=self.apply_transactions_filter,
                   bg=self.theme["ACCENT2"], fg=self.theme["TEXT"],
                   relief="flat", font=("Segoe UI", 10, "bold"),
                   padx=12, pady=6).pack(side="left", padx=12)
@@ -709,15 +3199,28 @@ class BudgetApp:
                               highlightbackground=self.theme["BORDER"], highlightthickness=2)
         table_card.pack(fill="both", expand=True, padx=25, pady=10)
 
-        columns = ("ID", "Title", "Amount", "Type", "Category", "Date")
-        self.tree = ttk.Treeview(table_card, columns=columns, show="headings", height=15)
-        self.tree.pack(fill="both", expand=True, padx=10, pady=10)
-
+        columns = ("ID", "Title", "Amount", "Currency", "Type", "Category", "Date")
+        self.trans_table = VirtualTable(
+            table_card, columns, self.worker, "page:transactions",
+            query=lambda: (self.search_var.get(), self.filter_var.get(), self.sort_var.get()),
+            fetch_rows=lambda repo, params, limit, offset: repo.transactions_page(*params, limit, offset),
+            count_rows=lambda repo, params: repo.count_transactions(*params[:2]),
+            bg=self.theme["CARD"],
+            on_error=self.show_transactions_error)
+        self.trans_table.pack(fill="both", expand=True, padx=10, pady=10)
+
+        tree = self.trans_table.tree
         for col in columns:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=170)
+            tree.heading(col, text=col)
+            tree.column(col, width=170)
 
-        self.tree.column("ID", width=60)
+        tree.column("ID", width=60)
+        tree.column("Currency", width=80)
+
+        self.count_label = tk.Label(table_card, text="",
+                                    bg=self.theme["CARD"], fg=self.theme["MUTED"],
+                                    font=("Segoe UI", 10, "bold"))
+        self.count_label.pack(anchor="w", padx=10, pady=(0, 10))
 
         btn_frame = tk.Frame(self.content_frame, bg=self.theme["BG"])
         btn_frame.pack(pady=10)
@@ -734,74 +3237,68 @@ class BudgetApp:
                   font=("Segoe UI", 11, "bold"),
                   relief="flat", padx=22, pady=8).pack(side="left", padx=10)
 
-        self.refresh_transactions_table()
-
-    def refresh_transactions_table(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        search_text = self.search_var.get().lower().strip()
-        filter_type = self.filter_var.get()
-        sort_option = self.sort_var.get()
-
-        cursor.execute("SELECT * FROM transactions")
-        rows = cursor.fetchall()
+        tk.Button(btn_frame, text="📤 Export",
+                  command=self.export_transactions,
+                  bg=self.theme["PURPLE"], fg="white",
+                  font=("Segoe UI", 11, "bold"),
+                  relief="flat", padx=22, pady=8).pack(side="left", padx=10)
 
-        filtered = []
-        for row in rows:
-            rid, title, amount, ttype, category, date = row
-            combined = f"{title} {amount} {ttype} {category} {date}".lower()
+        self.apply_transactions_filter(on_loaded)
 
-            if search_text and search_text not in combined:
-                continue
+    def apply_transactions_filter(self, on_loaded=None):
+        def loaded():
+            self.show_transactions_count()
+            if on_loaded is not None:
+                on_loaded()
 
-            if filter_type != "All" and ttype != filter_type:
-                continue
+        self.count_label.config(text="Loading...", fg=self.theme["MUTED"])
+        self.trans_table.refresh(reset=True, on_done=loaded)
 
-            filtered.append(row)
+    def refresh_transactions_table(self):
+        self.trans_table.refresh(on_done=self.show_transactions_count)
 
-        if sort_option == "Latest":
-            filtered.sort(key=lambda x: x[0], reverse=True)
-        elif sort_option == "Oldest":
-            filtered.sort(key=lambda x: x[0])
-        elif sort_option == "Highest":
-            filtered.sort(key=lambda x: x[2], reverse=True)
-        elif sort_option == "Lowest":
-            filtered.sort(key=lambda x: x[2])
+    def show_transactions_count(self):
+        self.count_label.config(text=f"{self.trans_table.total} transactions", fg=self.theme["MUTED"])
 
-        for row in filtered:
-            self.tree.insert("", tk.END, values=row)
+    def show_transactions_error(self, error):
+        self.count_label.config(text=f"Could not load transactions: {error}", fg=self.theme["DANGER"])
 
     def delete_transaction(self):
-        selected = self.tree.selection()
-        if not selected:
+        trans_id = self.trans_table.selected_id
+        if trans_id is None:
             messagebox.showwarning("Warning", "Select a transaction first!")
             return
 
-        trans_id = self.tree.item(selected[0])["values"][0]
+        if self.import_running():
+            return
 
         confirm = messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this transaction?")
         if not confirm:
             return
 
-        cursor.execute("DELETE FROM transactions WHERE id=?", (trans_id,))
-        conn.commit()
+        self.repo.delete_transaction(trans_id)
+        self.mark_data_changed()
+        self.trans_table.selected_id = None
 
         messagebox.showinfo("Deleted", "Transaction deleted successfully!")
         self.refresh_transactions_table()
 
     def edit_transaction(self):
-        selected = self.tree.selection()
-        if not selected:
+        trans_id = self.trans_table.selected_id
+        if trans_id is None:
             messagebox.showwarning("Warning", "Select a transaction first!")
             return
 
-        data = self.tree.item(selected[0])["values"]
-        trans_id, title, amount, t_type, category, date = data
+        data = self.repo.get_transaction(trans_id)
+        if data is None:
+            messagebox.showwarning("Warning", "Transaction no longer exists!")
+            return
+
+        trans_id, title, amount, currency, t_type, category, date = data
 
         win = tk.Toplevel(self.root)
         win.title("Edit Transaction ✏️")
-        win.geometry("420x380")
+        win.geometry("420x430")
         win.configure(bg=self.theme["BG"])
         win.resizable(False, False)
 
@@ -825,6 +3322,10 @@ class BudgetApp:
         ttk.Combobox(win, textvariable=category_var,
                      values=categories_list, width=27).pack(pady=10)
 
+        currency_var = tk.StringVar(value=currency)
+        ttk.Combobox(win, textvariable=currency_var,
+                     values=list(CURRENCY_FORMATS), width=27).pack(pady=10)
+
         def save_edit():
             new_title = title_entry.get().strip()
             new_amount = amount_entry.get().strip()
@@ -839,45 +3340,219 @@ class BudgetApp:
                 messagebox.showerror("Error", "Amount must be number!")
                 return
 
-            cursor.execute("""
-                UPDATE transactions
-                SET title=?, amount=?, type=?, category=?
-                WHERE id=?
-            """, (new_title, new_amount, type_var.get(), category_var.get(), trans_id))
+            if self.import_running():
+                return
 
-            conn.commit()
+            self.repo.update_transaction(trans_id, new_title, new_amount, type_var.get(), category_var.get(),
+                                         currency_var.get().strip().upper() or currency)
+            self.mark_data_changed()
             messagebox.showinfo("Updated", "Transaction updated successfully!")
             win.destroy()
             self.refresh_transactions_table()
 
-        tk.Button(win, text="💾 Save Changes",
-                  command=save_edit,
-                  bg=self.theme["ACCENT"], fg="white",
-                  font=("Segoe UI", 11, "bold"),
-                  relief="flat", padx=20, pady=10).pack(pady=20)
+        tk.Button(win, text="💾 Save Changes",
+                  command=save_edit,
+                  bg=self.theme["ACCENT"], fg="white",
+                  font=("Segoe UI", 11, "bold"),
+                  relief="flat", padx=20, pady=10).pack(pady=20)
+
+    # ---------------- RECURRING PAGE ---------------- #
+    def recurring_materialized(self, created):
+        if created:
+            self.mark_data_changed()
+
+    def show_recurring_page(self):
+        self.clear_content()
+
+        tk.Label(self.content_frame, text="Recurring Transactions 🔁",
+                 font=("Segoe UI", 24, "bold"),
+                 bg=self.theme["BG"], fg=self.theme["TEXT"]).pack(anchor="w", padx=25, pady=15)
+
+        tk.Label(self.content_frame,
+                 text="Add one with \"Repeat\" on the Add Transaction page. "
+                      "Due transactions are created every time PocketPlanner opens.",
+                 font=("Segoe UI", 10, "bold"),
+                 bg=self.theme["BG"], fg=self.theme["MUTED"]).pack(anchor="w", padx=25)
+
+        table_card = tk.Frame(self.content_frame, bg=self.theme["CARD"],
+                              highlightbackground=self.theme["BORDER"], highlightthickness=2)
+        table_card.pack(fill="both", expand=True, padx=25, pady=10)
+
+        columns = ("ID", "Title", "Amount", "Type", "Category", "Repeats", "Next", "Until")
+        self.recurring_table = ttk.Treeview(table_card, columns=columns, show="headings", selectmode="browse")
+        for col in columns:
+            self.recurring_table.heading(col, text=col)
+            self.recurring_table.column(col, width=140)
+        self.recurring_table.column("ID", width=50)
+        self.recurring_table.column("Type", width=80)
+        self.recurring_table.pack(fill="both", expand=True, padx=10, pady=10)
+
+        btn_frame = tk.Frame(self.content_frame, bg=self.theme["BG"])
+        btn_frame.pack(pady=10)
+
+        tk.Button(btn_frame, text="💲 Change Amount",
+                  command=self.change_recurring_amount,
+                  bg=self.theme["ACCENT2"], fg=self.theme["TEXT"],
+                  font=("Segoe UI", 11, "bold"),
+                  relief="flat", padx=22, pady=8).pack(side="left", padx=10)
+
+        tk.Button(btn_frame, text="⏹ End Today",
+                  command=self.end_recurring_rule,
+                  bg=self.theme["PURPLE"], fg="white",
+                  font=("Segoe UI", 11, "bold"),
+                  relief="flat", padx=22, pady=8).pack(side="left", padx=10)
+
+        tk.Button(btn_frame, text="🗑 Delete Rule",
+                  command=self.delete_recurring_rule,
+                  bg=self.theme["DANGER"], fg="white",
+                  font=("Segoe UI", 11, "bold"),
+                  relief="flat", padx=22, pady=8).pack(side="left", padx=10)
+
+        self.refresh_recurring_table()
+
+    def refresh_recurring_table(self):
+        self.recurring_table.delete(*self.recurring_table.get_children())
+        now = datetime.now()
+        for rule_id, title, amount, currency, t_type, category, frequency, interval, start, end in \
+                self.repo.recurring_rules():
+            upcoming = next_occurrence(frequency, interval, start, end, now)
+            until = datetime.strptime(end, "%Y-%m-%d").strftime("%d-%m-%Y") if end else "—"
+            self.recurring_table.insert("", "end", iid=str(rule_id), values=(
+                rule_id, title, format_currency(currency, amount), t_type, category,
+                describe_recurrence(frequency, interval),
+                upcoming.strftime(DATE_FORMAT) if upcoming else "Ended", until))
+
+    def selected_recurring_rule(self):
+        selection = self.recurring_table.selection()
+        if not selection:
+            messagebox.showwarning("Warning", "Select a recurring transaction first!")
+            return None
+        return int(selection[0])
+
+    def change_recurring_amount(self):
+        rule_id = self.selected_recurring_rule()
+        if rule_id is None:
+            return
+
+        win = tk.Toplevel(self.root)
+        win.title("Change Amount 💲")
+        win.geometry("380x260")
+        win.configure(bg=self.theme["BG"])
+        win.resizable(False, False)
+
+        tk.Label(win, text="New Amount",
+                 font=("Segoe UI", 11, "bold"),
+                 bg=self.theme["BG"], fg=self.theme["TEXT"]).pack(pady=(15, 5))
+
+        amount_entry = tk.Entry(win, width=28, font=("Segoe UI", 12))
+        amount_entry.pack(pady=5)
+        amount_entry.focus_set()
+
+        tk.Label(win, text="From (DD-MM-YYYY)",
+                 font=("Segoe UI", 11, "bold"),
+                 bg=self.theme["BG"], fg=self.theme["TEXT"]).pack(pady=(10, 5))
+
+        from_entry = tk.Entry(win, width=28, font=("Segoe UI", 12))
+        from_entry.pack(pady=5)
+        from_entry.insert(0, datetime.now().strftime("%d-%m-%Y"))
+
+        def save_amount():
+            try:
+                amount = float(amount_entry.get().strip())
+                effective = parse_import_date(from_entry.get(), "%d-%m-%Y")[0]
+            except ValueError:
+                messagebox.showerror("Error", "Enter an amount and a date like 01-04-2025!", parent=win)
+                return
+
+            if self.import_running():
+                return
+
+            self.repo.change_recurring_amount(rule_id, amount, effective)
+            win.destroy()
+            self.refresh_recurring_table()
+
+        tk.Button(win, text="💾 Save",
+                  command=save_amount,
+                  bg=self.theme["ACCENT"], fg="white",
+                  font=("Segoe UI", 11, "bold"),
+                  relief="flat", padx=20, pady=8).pack(pady=15)
+
+    def end_recurring_rule(self):
+        rule_id = self.selected_recurring_rule()
+        if rule_id is None:
+            return
+        if self.import_running():
+            return
+        if not messagebox.askyesno("End Recurring", "Stop repeating this transaction after today?"):
+            return
+
+        self.repo.end_recurring_rule(rule_id)
+        self.refresh_recurring_table()
+
+    def delete_recurring_rule(self):
+        rule_id = self.selected_recurring_rule()
+        if rule_id is None:
+            return
+        if self.import_running():
+            return
+        if not messagebox.askyesno("Confirm Delete",
+                                   "Delete this recurring rule? Transactions it already created are kept."):
+            return
+
+        self.repo.delete_recurring_rule(rule_id)
+        self.refresh_recurring_table()
 
     # ---------------- REPORTS PAGE ---------------- #
     def show_reports_page(self):
-        self.clear_content()
+        # the page (and its chart canvases) survives data changes; only the
+        # chart contents are refreshed
+        if not self.show_cached_page("reports", self.build_reports_page, data_bound=False):
+            self.refresh_report_years()
+
+        def rates_checked(missing):
+            for widget in self.report_rates_frame.winfo_children():
+                widget.destroy()
+            self.show_missing_rates(self.report_rates_frame, missing)
 
-        tk.Label(self.content_frame, text="Reports 📊",
+        self.load_in_background("report:rates", BudgetRepository.currencies_without_rates, rates_checked)
+        self.render_selected_report_tab()
+
+    def build_reports_page(self, page):
+        tk.Label(page, text="Reports 📊",
                  font=("Segoe UI", 24, "bold"),
                  bg=self.theme["BG"], fg=self.theme["TEXT"]).pack(anchor="w", padx=25, pady=10)
 
-        tk.Button(self.content_frame, text="📄 Download Monthly PDF Report",
+        # filled on every visit, since the page outlives rate imports
+        self.report_rates_frame = tk.Frame(page, bg=self.theme["BG"])
+        self.report_rates_frame.pack(fill="x")
+
+        tk.Button(page, text="📄 Download Monthly PDF Report",
                   command=self.export_monthly_pdf_report,
                   bg=self.theme["PURPLE"], fg="white",
                   font=("Segoe UI", 12, "bold"),
                   relief="flat", padx=20, pady=10).pack(pady=5)
 
-        tk.Button(self.content_frame, text="📄 Download Yearly PDF Report",
+        tk.Button(page, text="📄 Download Yearly PDF Report",
                   command=self.export_yearly_pdf_report,
                   bg=self.theme["PURPLE"], fg="white",
                   font=("Segoe UI", 12, "bold"),
                   relief="flat", padx=20, pady=10).pack(pady=5)
 
-        report_tabs = ttk.Notebook(self.content_frame)
+        tk.Button(page, text="📚 Download All Monthly PDFs of the Year",
+                  command=self.export_all_monthly_pdf_reports,
+                  bg=self.theme["PURPLE"], fg="white",
+                  font=("Segoe UI", 12, "bold"),
+                  relief="flat", padx=20, pady=10).pack(pady=5)
+
+        tk.Button(page, text="📤 Export Report Totals",
+                  command=self.export_totals_window,
+                  bg=self.theme["PURPLE"], fg="white",
+                  font=("Segoe UI", 12, "bold"),
+                  relief="flat", padx=20, pady=10).pack(pady=5)
+
+        report_tabs = ttk.Notebook(page)
         report_tabs.pack(fill="both", expand=True, padx=20, pady=10)
+        self.report_tabs = report_tabs
 
         monthly_tab = tk.Frame(report_tabs, bg=self.theme["BG"])
         report_tabs.add(monthly_tab, text="Monthly")
@@ -891,8 +3566,11 @@ class BudgetApp:
         compare_tab = tk.Frame(report_tabs, bg=self.theme["BG"])
         report_tabs.add(compare_tab, text="3-Month Compare")
 
+        years = [str(y) for y in self.repo.report_years()]
+
         # MONTHLY TAB
         self.month_var = tk.StringVar(value="All")
+        self.month_year_var = tk.StringVar(value="All")
 
         top = tk.Frame(monthly_tab, bg=self.theme["BG"])
         top.pack(fill="x", padx=20, pady=15)
@@ -901,12 +3579,19 @@ class BudgetApp:
                  bg=self.theme["BG"], fg=self.theme["TEXT"],
                  font=("Segoe UI", 11, "bold")).pack(side="left")
 
-        months = ["All", "January", "February", "March", "April", "May", "June",
-                  "July", "August", "September", "October", "November", "December"]
+        months = ["All"] + MONTH_NAMES
 
         ttk.Combobox(top, textvariable=self.month_var,
                      values=months, width=18).pack(side="left", padx=10)
 
+        tk.Label(top, text="Year:",
+                 bg=self.theme["BG"], fg=self.theme["TEXT"],
+                 font=("Segoe UI", 11, "bold")).pack(side="left")
+
+        self.month_year_box = ttk.Combobox(top, textvariable=self.month_year_var,
+                                           values=["All"] + years, width=8)
+        self.month_year_box.pack(side="left", padx=10)
+
         tk.Button(top, text="Show Report",
                   command=self.show_monthly_chart,
                   bg=self.theme["ACCENT2"], fg=self.theme["TEXT"],
@@ -917,11 +3602,24 @@ class BudgetApp:
         self.month_chart_container.pack(fill="both", expand=True, padx=20, pady=20)
 
         # YEARLY TAB
-        tk.Button(yearly_tab, text="📅 Show Yearly Expense Report",
+        self.year_var = tk.StringVar(value=years[0])
+
+        year_top = tk.Frame(yearly_tab, bg=self.theme["BG"])
+        year_top.pack(pady=15)
+
+        tk.Label(year_top, text="Select Year:",
+                 bg=self.theme["BG"], fg=self.theme["TEXT"],
+                 font=("Segoe UI", 11, "bold")).pack(side="left")
+
+        self.year_box = ttk.Combobox(year_top, textvariable=self.year_var,
+                                     values=years, width=8)
+        self.year_box.pack(side="left", padx=10)
+
+        tk.Button(year_top, text="📅 Show Yearly Expense Report",
                   command=self.show_yearly_chart,
                   bg=self.theme["ACCENT2"], fg=self.theme["TEXT"],
                   font=("Segoe UI", 11, "bold"),
-                  relief="flat", padx=15, pady=8).pack(pady=15)
+                  relief="flat", padx=15, pady=8).pack(side="left")
 
         self.year_chart_container = tk.Frame(yearly_tab, bg=self.theme["CARD"])
         self.year_chart_container.pack(fill="both", expand=True, padx=20, pady=20)
@@ -944,303 +3642,233 @@ class BudgetApp:
         self.compare_chart_container = tk.Frame(compare_tab, bg=self.theme["CARD"])
         self.compare_chart_container.pack(fill="both", expand=True, padx=20, pady=20)
 
-        self.show_monthly_chart()
-        self.show_3month_comparison_chart()
+        # charts are drawn the first time their tab is shown, not up front
+        self.report_tab_renderers = {
+            str(monthly_tab): ("monthly", self.show_monthly_chart),
+            str(yearly_tab): ("yearly", self.show_yearly_chart),
+            str(pie_tab): ("pie", self.show_category_pie_chart),
+            str(compare_tab): ("compare", self.show_3month_comparison_chart),
+        }
+        report_tabs.bind("<<NotebookTabChanged>>", lambda e: self.render_selected_report_tab())
+
+    def render_selected_report_tab(self):
+        """Draw the visible tab's chart unless it is already current."""
+        name, render = self.report_tab_renderers[self.report_tabs.select()]
+        if self.report_rendered.get(name) != self.data_version:
+            render()
+
+    def refresh_report_years(self):
+        years = [str(y) for y in self.repo.report_years()]
+        self.month_year_box["values"] = ["All"] + years
+        self.year_box["values"] = years
+
+    # ---------------- REPORT CHARTS ---------------- #
+    def show_chart_loading(self, name, container):
+        """Placeholder until a tab's first chart arrives from the worker;
+        returns it, or None once the tab has a chart."""
+        if name in self.report_charts:
+            return None
+        for widget in container.winfo_children():
+            widget.destroy()
+        label = tk.Label(container, text="Loading...",
+                         font=("Segoe UI", 14, "bold"),
+                         bg=self.theme["CARD"], fg=self.theme["MUTED"])
+        label.pack(pady=50)
+        return label
+
+    def report_chart(self, name, container, figsize):
+        """The one Figure/canvas of a report tab, created on first use."""
+        chart = self.report_charts.get(name)
+        if chart is None:
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            from matplotlib.figure import Figure
+
+            for widget in container.winfo_children():
+                widget.destroy()
+
+            fig = Figure(figsize=figsize, dpi=100)
+            canvas = FigureCanvasTkAgg(fig, master=container)
+            canvas.get_tk_widget().pack(fill="both", expand=True)
+            chart = {"fig": fig, "ax": fig.add_subplot(111), "canvas": canvas, "bars": None}
+            self.report_charts[name] = chart
+        return chart
+
+    def update_bar_chart(self, name, container, figsize, labels, values, title, ylabel, rotation=0):
+        """Draw a bar chart into the tab's figure, moving the existing bars
+        when the bar count is unchanged instead of rebuilding the axes."""
+        chart = self.report_chart(name, container, figsize)
+        ax = chart["ax"]
+        positions = list(range(len(labels)))
+
+        if chart["bars"] is not None and len(chart["bars"]) == len(values):
+            for bar, value in zip(chart["bars"], values):
+                bar.set_height(value)
+        else:
+            ax.clear()
+            chart["bars"] = ax.bar(positions, values)
+
+        ax.set_xticks(positions, labels, rotation=rotation)
+        ax.set_title(title)
+        ax.set_ylabel(ylabel)
+        ax.relim()
+        ax.autoscale_view()
+        chart["canvas"].draw_idle()
 
     def show_monthly_chart(self):
-        for w in self.month_chart_container.winfo_children():
-            w.destroy()
-
         month = self.month_var.get()
-
-        cursor.execute("SELECT amount, type, date FROM transactions")
-        rows = cursor.fetchall()
-
-        income = 0
-        expense = 0
-
-        for amount, t_type, date_str in rows:
-            trans_month = datetime.strptime(date_str, "%d-%m-%Y %H:%M").strftime("%B")
-
-            if month == "All" or trans_month == month:
-                if t_type == "Income":
-                    income += amount
-                else:
-                    expense += amount
-
-        fig = Figure(figsize=(7, 4), dpi=100)
-        ax = fig.add_subplot(111)
-
-        ax.bar(["Income", "Expense"], [income, expense])
-        ax.set_title(f"{month} Report")
-        ax.set_ylabel("Amount")
-
-        canvas = FigureCanvasTkAgg(fig, master=self.month_chart_container)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+        year = self.month_year_var.get()
+        version = self.data_version
+
+        def draw(totals):
+            income = 0
+            expense = 0
+
+            for _, m, t_type, _, total in totals:
+                if month == "All" or MONTH_NAMES[m - 1] == month:
+                    if t_type == "Income":
+                        income += total
+                    else:
+                        expense += total
+
+            self.update_bar_chart("monthly", self.month_chart_container, (7, 4),
+                                  ["Income", "Expense"], [income, expense],
+                                  f"{month} {year} Report" if year != "All" else f"{month} Report",
+                                  "Amount")
+            self.report_rendered["monthly"] = version
+
+        placeholder = self.show_chart_loading("monthly", self.month_chart_container)
+        self.load_in_background(
+            "report:monthly",
+            lambda repo: repo.period_totals(None if year == "All" else int(year)),
+            draw, placeholder)
 
     def show_yearly_chart(self):
-        for w in self.year_chart_container.winfo_children():
-            w.destroy()
-
-        months = ["January", "February", "March", "April", "May", "June",
-                  "July", "August", "September", "October", "November", "December"]
-
-        month_expenses = {m: 0 for m in months}
-
-        cursor.execute("SELECT amount, date FROM transactions WHERE type='Expense'")
-        rows = cursor.fetchall()
+        months = MONTH_NAMES
+        year = int(self.year_var.get())
+        version = self.data_version
 
-        for amount, date_str in rows:
-            m = datetime.strptime(date_str, "%d-%m-%Y %H:%M").strftime("%B")
-            if m in month_expenses:
-                month_expenses[m] += amount
+        def draw(totals):
+            month_expenses = {m: 0 for m in months}
 
-        fig = Figure(figsize=(8, 4), dpi=100)
-        ax = fig.add_subplot(111)
+            for _, m, t_type, _, total in totals:
+                if t_type == "Expense":
+                    month_expenses[months[m - 1]] += total
 
-        ax.bar(months, list(month_expenses.values()))
-        ax.set_title("Yearly Expense Report")
-        ax.set_ylabel("Expense")
-        ax.tick_params(axis='x', rotation=45)
+            self.update_bar_chart("yearly", self.year_chart_container, (8, 4),
+                                  months, list(month_expenses.values()),
+                                  f"Yearly Expense Report {year}", "Expense", rotation=45)
+            self.report_rendered["yearly"] = version
 
-        canvas = FigureCanvasTkAgg(fig, master=self.year_chart_container)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+        placeholder = self.show_chart_loading("yearly", self.year_chart_container)
+        self.load_in_background("report:yearly", lambda repo: repo.period_totals(year), draw, placeholder)
 
     def show_category_pie_chart(self):
-        for w in self.pie_chart_container.winfo_children():
-            w.destroy()
-
-        cursor.execute("SELECT category, SUM(amount) FROM transactions WHERE type='Expense' GROUP BY category")
-        rows = cursor.fetchall()
-
-        if not rows:
-            tk.Label(self.pie_chart_container, text="No Expense Data Found!",
-                     font=("Segoe UI", 14, "bold"),
-                     bg=self.theme["CARD"], fg=self.theme["TEXT"]).pack(pady=50)
-            return
-
-        labels = [r[0] for r in rows]
-        values = [r[1] for r in rows]
-
-        fig = Figure(figsize=(6, 5), dpi=100)
-        ax = fig.add_subplot(111)
+        version = self.data_version
+
+        def draw(rows):
+            chart = self.report_chart("pie", self.pie_chart_container, (6, 5))
+            ax = chart["ax"]
+
+            # wedge count follows the categories, so the pie is redrawn on the
+            # same axes rather than patched
+            ax.clear()
+            if rows:
+                labels = [r[0] for r in rows]
+                values = [r[1] for r in rows]
+                ax.pie(values, labels=labels, autopct="%1.1f%%", startangle=90)
+                ax.set_title("Category Wise Expense")
+            else:
+                ax.axis("off")
+                ax.text(0.5, 0.5, "No Expense Data Found!", ha="center", va="center",
+                        fontsize=14, fontweight="bold")
 
-        ax.pie(values, labels=labels, autopct="%1.1f%%", startangle=90)
-        ax.set_title("Category Wise Expense")
+            chart["canvas"].draw_idle()
+            self.report_rendered["pie"] = version
 
-        canvas = FigureCanvasTkAgg(fig, master=self.pie_chart_container)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+        placeholder = self.show_chart_loading("pie", self.pie_chart_container)
+        self.load_in_background("report:pie", BudgetRepository.category_totals, draw, placeholder)
 
     def show_3month_comparison_chart(self):
-        for w in self.compare_chart_container.winfo_children():
-            w.destroy()
+        now = datetime.now()
+        version = self.data_version
 
-        months = ["January", "February", "March", "April", "May", "June",
-                  "July", "August", "September", "October", "November", "December"]
+        # (year, month) of the last three calendar months, oldest first
+        periods = []
+        for back in (2, 1, 0):
+            index = now.year * 12 + (now.month - 1) - back
+            periods.append((index // 12, index % 12 + 1))
 
-        current_index = datetime.now().month - 1
+        selected_months = [f"{MONTH_NAMES[m - 1]} {y}" for y, m in periods]
 
-        selected_months = [
-            months[(current_index - 2) % 12],
-            months[(current_index - 1) % 12],
-            months[current_index]
-        ]
+        def draw(period_totals):
+            month_expenses = {label: 0 for label in selected_months}
 
-        month_expenses = {m: 0 for m in selected_months}
+            for totals, label in zip(period_totals, selected_months):
+                for _, _, t_type, _, total in totals:
+                    if t_type == "Expense":
+                        month_expenses[label] += total
 
-        cursor.execute("SELECT amount, date FROM transactions WHERE type='Expense'")
-        rows = cursor.fetchall()
+            self.update_bar_chart("compare", self.compare_chart_container, (8, 4),
+                                  selected_months, list(month_expenses.values()),
+                                  "Last 3 Months Expense Comparison", "Expense Amount")
+            self.report_rendered["compare"] = version
 
-        for amount, date_str in rows:
-            trans_month = datetime.strptime(date_str, "%d-%m-%Y %H:%M").strftime("%B")
-            if trans_month in month_expenses:
-                month_expenses[trans_month] += amount
-
-        fig = Figure(figsize=(8, 4), dpi=100)
-        ax = fig.add_subplot(111)
-
-        ax.bar(selected_months, list(month_expenses.values()))
-        ax.set_title("Last 3 Months Expense Comparison")
-        ax.set_ylabel("Expense Amount")
-
-        canvas = FigureCanvasTkAgg(fig, master=self.compare_chart_container)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+        placeholder = self.show_chart_loading("compare", self.compare_chart_container)
+        self.load_in_background(
+            "report:compare",
+            lambda repo: [repo.period_totals(y, m) for y, m in periods],
+            draw, placeholder)
 
     # ---------------- PDF MONTHLY REPORT ---------------- #
     def export_monthly_pdf_report(self):
         try:
-            from reportlab.lib.pagesizes import A4
-            from reportlab.pdfgen import canvas
-            from reportlab.lib import colors
-        except:
+            import reportlab  # noqa: F401
+        except ImportError:
             messagebox.showerror("Missing Library", "Please install reportlab:\n\npip install reportlab")
             return
 
-        month = datetime.now().strftime("%B")
-        year = datetime.now().strftime("%Y")
+        now = datetime.now()
 
         file_path = filedialog.asksaveasfilename(
             defaultextension=".pdf",
             filetypes=[("PDF Files", "*.pdf")],
-            initialfile=f"PocketPlanner_Monthly_Report_{month}_{year}.pdf"
-           
+            initialfile=monthly_pdf_report_name(now.year, now.month)
         )
 
         if not file_path:
             return
 
-        cursor.execute("SELECT title, amount, type, category, date FROM transactions")
-        rows = cursor.fetchall()
-
-        total_income = 0
-        total_expense = 0
-        monthly_transactions = []
-        category_totals = {}
-
-        for title, amount, ttype, category, date_str in rows:
-            trans_month = datetime.strptime(date_str, "%d-%m-%Y %H:%M").strftime("%B")
-            trans_year = datetime.strptime(date_str, "%d-%m-%Y %H:%M").strftime("%Y")
-
-            if trans_month == month and trans_year == year:
-                monthly_transactions.append((title, amount, ttype, category, date_str))
-
-                if ttype == "Income":
-                    total_income += amount
-                else:
-                    total_expense += amount
-                    category_totals[category] = category_totals.get(category, 0) + amount
-
-        balance = total_income - total_expense
-        budget = self.get_monthly_budget()
-
-        # temp charts
-        temp_dir = tempfile.gettempdir()
-        bar_chart_path = os.path.join(temp_dir, "income_expense_chart.png")
-        pie_chart_path = os.path.join(temp_dir, "category_pie_chart.png")
-
-        fig1 = Figure(figsize=(5, 3), dpi=120)
-        ax1 = fig1.add_subplot(111)
-        ax1.bar(["Income", "Expense"], [total_income, total_expense])
-        ax1.set_title("Income vs Expense")
-        ax1.set_ylabel("Amount")
-        fig1.savefig(bar_chart_path)
-
-        if category_totals:
-            labels = list(category_totals.keys())
-            values = list(category_totals.values())
-
-            fig2 = Figure(figsize=(5, 3), dpi=120)
-            ax2 = fig2.add_subplot(111)
-            ax2.pie(values, labels=labels, autopct="%1.1f%%", startangle=90)
-            ax2.set_title("Expense Categories")
-            fig2.savefig(pie_chart_path)
-
-        # PDF
-        c = canvas.Canvas(file_path, pagesize=A4)
-        width, height = A4
-        y = height - 60
-
-        c.setFont("Helvetica-Bold", 20)
-        c.drawString(50, y, "PocketPlanner Monthly Report")
-        y -= 30
-
-        c.setFont("Helvetica", 12)
-        c.drawString(50, y, f"Month: {month} {year}")
-        y -= 20
-        c.drawString(50, y, f"Generated: {datetime.now().strftime('%d-%m-%Y %H:%M')}")
-        y -= 30
-
-        c.setFont("Helvetica-Bold", 13)
-        c.drawString(50, y, "Summary")
-        y -= 20
-
-        c.setFont("Helvetica", 12)
-        c.drawString(60, y, f"Total Income: {self.format_money(total_income)}")
-        y -= 18
-        c.drawString(60, y, f"Total Expense: {self.format_money(total_expense)}")
-        y -= 18
-        c.drawString(60, y, f"Balance: {self.format_money(balance)}")
-        y -= 18
-        c.drawString(60, y, f"Monthly Budget Set: {self.format_money(budget)}")
-        y -= 25
-
-        if budget > 0:
-            percent = (total_expense / budget) * 100
-
-            c.setFont("Helvetica-Bold", 12)
-            if total_expense > budget:
-                c.setFillColor(colors.red)
-                c.drawString(60, y, f"⚠ Budget Exceeded ({percent:.1f}%)")
-            else:
-                c.setFillColor(colors.green)
-                c.drawString(60, y, f"✅ Budget Safe ({percent:.1f}%)")
-
-            c.setFillColor(colors.black)
-            y -= 30
-
-        c.setFont("Helvetica-Bold", 13)
-        c.drawString(50, y, "Charts")
-        y -= 20
-
-        if os.path.exists(bar_chart_path):
-            c.drawImage(bar_chart_path, 60, y - 200, width=220, height=180)
+        self.run_export(
+            "Generating monthly PDF...",
+            lambda repo: write_monthly_pdf_report(repo, file_path, now.year, now.month, chart_pool()),
+            f"Monthly report saved successfully!\n\n{file_path}")
 
-        if os.path.exists(pie_chart_path):
-            c.drawImage(pie_chart_path, 320, y - 200, width=220, height=180)
-
-        y -= 240
+    def export_all_monthly_pdf_reports(self):
+        try:
+            import reportlab  # noqa: F401
+        except ImportError:
+            messagebox.showerror("Missing Library", "Please install reportlab:\n\npip install reportlab")
+            return
 
-        c.setFont("Helvetica-Bold", 13)
-        c.drawString(50, y, "Transactions List")
-        y -= 25
+        year = datetime.now().year
+        folder = filedialog.askdirectory(title=f"Save the 12 monthly reports of {year} in")
+        if not folder:
+            return
 
-        if not monthly_transactions:
-            c.setFont("Helvetica", 12)
-            c.drawString(60, y, "No transactions found for this month.")
-            y -= 20
-        else:
-            c.setFont("Helvetica-Bold", 10)
-            c.drawString(50, y, "Title")
-            c.drawString(200, y, "Amount")
-            c.drawString(290, y, "Type")
-            c.drawString(350, y, "Category")
-            c.drawString(470, y, "Date")
-            y -= 15
-
-            c.setFont("Helvetica", 9)
-
-            for title, amount, ttype, category, date_str in monthly_transactions:
-                if y < 80:
-                    c.showPage()
-                    y = height - 60
-
-                c.drawString(50, y, title[:20])
-                c.drawString(200, y, self.format_money(amount))
-                c.drawString(290, y, ttype)
-                c.drawString(350, y, category[:15])
-                c.drawString(470, y, date_str)
-                y -= 15
-
-        c.setFont("Helvetica-Oblique", 10)
-        c.drawString(50, 40, "Generated by PocketPlanner 💖")
-        c.save()
-
-        messagebox.showinfo("PDF Exported", f"Monthly report saved successfully!\n\n{file_path}")
+        self.run_export(
+            "Generating 12 monthly PDFs...",
+            lambda repo: write_monthly_pdf_reports(repo, folder, year, chart_pool()),
+            f"All monthly reports for {year} saved successfully!\n\n{folder}")
 
     # ---------------- PDF YEARLY REPORT ---------------- #
     def export_yearly_pdf_report(self):
         try:
-            from reportlab.lib.pagesizes import A4
-            from reportlab.pdfgen import canvas
-        except:
+            import reportlab  # noqa: F401
+        except ImportError:
             messagebox.showerror("Missing Library", "Please install reportlab:\n\npip install reportlab")
             return
 
-        year = datetime.now().strftime("%Y")
+        year = datetime.now().year
 
         file_path = filedialog.asksaveasfilename(
             defaultextension=".pdf",
@@ -1251,101 +3879,91 @@ class BudgetApp:
         if not file_path:
             return
 
-        cursor.execute("SELECT amount, type, date FROM transactions")
-        rows = cursor.fetchall()
-
-        total_income = 0
-        total_expense = 0
+        self.run_export(
+            "Generating yearly PDF...",
+            lambda repo: write_yearly_pdf_report(repo, file_path, year, chart_pool()),
+            f"Yearly report saved successfully!\n\n{file_path}")
 
-        month_data = {
-            "January": 0, "February": 0, "March": 0, "April": 0,
-            "May": 0, "June": 0, "July": 0, "August": 0,
-            "September": 0, "October": 0, "November": 0, "December": 0
-        }
-
-        for amount, ttype, date_str in rows:
-            trans_year = datetime.strptime(date_str, "%d-%m-%Y %H:%M").strftime("%Y")
-            trans_month = datetime.strptime(date_str, "%d-%m-%Y %H:%M").strftime("%B")
-
-            if trans_year == year:
-                if ttype == "Income":
-                    total_income += amount
-                else:
-                    total_expense += amount
-                    month_data[trans_month] += amount
-
-        balance = total_income - total_expense
-
-        temp_dir = tempfile.gettempdir()
-        yearly_chart_path = os.path.join(temp_dir, "yearly_expense_chart.png")
-
-        fig = Figure(figsize=(7, 3), dpi=120)
-        ax = fig.add_subplot(111)
-
-        months = list(month_data.keys())
-        values = list(month_data.values())
+    def run_export(self, status, job, done_message, title="PDF Exported"):
+        """Run an export on the worker; it keeps going across page changes."""
+        self.set_status(status)
 
-        ax.bar(months, values)
-        ax.set_title("Yearly Expense Chart")
-        ax.set_ylabel("Expense")
-        ax.tick_params(axis='x', rotation=45)
-
-        fig.savefig(yearly_chart_path)
-
-        c = canvas.Canvas(file_path, pagesize=A4)
-        width, height = A4
-        y = height - 60
-
-        c.setFont("Helvetica-Bold", 20)
-        c.drawString(50, y, "PocketPlanner Yearly Report")
-        y -= 30
-
-        c.setFont("Helvetica", 12)
-        c.drawString(50, y, f"Year: {year}")
-        y -= 20
-        c.drawString(50, y, f"Generated: {datetime.now().strftime('%d-%m-%Y %H:%M')}")
-        y -= 30
+        def done(_):
+            self.set_status("")
+            messagebox.showinfo(title, done_message)
 
-        c.setFont("Helvetica-Bold", 13)
-        c.drawString(50, y, "Summary")
-        y -= 20
+        def failed(error):
+            self.set_status("")
+            messagebox.showerror("Export Failed", str(error))
 
-        c.setFont("Helvetica", 12)
-        c.drawString(60, y, f"Total Income: {self.format_money(total_income)}")
-        y -= 18
-        c.drawString(60, y, f"Total Expense: {self.format_money(total_expense)}")
-        y -= 18
-        c.drawString(60, y, f"Balance: {self.format_money(balance)}")
-        y -= 30
+        self.worker.submit("export:" + done_message, job, done, failed)
 
-        c.setFont("Helvetica-Bold", 13)
-        c.drawString(50, y, "Yearly Expense Chart")
-        y -= 20
+    # ---------------- DATA EXPORT ---------------- #
+    def ask_export_path(self, initialfile):
+        return filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV Files", "*.csv"), ("JSON Lines", "*.jsonl"), ("Parquet Files", "*.parquet")],
+            initialfile=initialfile
+        )
 
-        if os.path.exists(yearly_chart_path):
-            c.drawImage(yearly_chart_path, 70, y - 220, width=460, height=200)
+    def export_transactions(self):
+        """Export every transaction matching the current search, filter and sort."""
+        search_text = self.search_var.get()
+        filter_type = self.filter_var.get()
+        sort_option = self.sort_var.get()
 
-        y -= 250
+        file_path = self.ask_export_path("PocketPlanner_Transactions.csv")
+        if not file_path:
+            return
 
-        c.setFont("Helvetica-Bold", 13)
-        c.drawString(50, y, "Month Wise Expense")
-        y -= 20
+        self.run_export(
+            "Exporting transactions...",
+            lambda repo: export_data(repo, file_path, "transactions", search_text, filter_type, sort_option),
+            f"Transactions exported successfully!\n\n{file_path}",
+            "Data Exported")
 
-        c.setFont("Helvetica", 11)
-        for m, v in month_data.items():
-            if y < 80:
-                c.showPage()
-                y = height - 60
+    def export_totals_window(self):
+        win = tk.Toplevel(self.root)
+        win.title("Export Report Totals 📤")
+        win.geometry("380x260")
+        win.configure(bg=self.theme["BG"])
+        win.resizable(False, False)
 
-            c.drawString(70, y, f"{m}: {self.format_money(v)}")
-            y -= 15
+        tk.Label(win, text="Export Report Totals 📤",
+                 font=("Segoe UI", 15, "bold"),
+                 bg=self.theme["BG"], fg=self.theme["TEXT"]).pack(pady=15)
 
-        c.setFont("Helvetica-Oblique", 10)
-        c.drawString(50, 40, "Generated by PocketPlanner 💖")
+        dataset_var = tk.StringVar(value="monthly")
+        for text, value in (("Monthly totals by category", "monthly"), ("Category totals", "categories")):
+            tk.Radiobutton(win, text=text, variable=dataset_var, value=value,
+                           bg=self.theme["BG"], fg=self.theme["TEXT"],
+                           selectcolor=self.theme["CARD"], font=("Segoe UI", 11)).pack(anchor="w", padx=40)
+
+        tk.Label(win, text="Type", bg=self.theme["BG"], fg=self.theme["MUTED"]).pack(pady=(10, 0))
+        filter_var = tk.StringVar(value="All")
+        ttk.Combobox(win, textvariable=filter_var, values=["All", "Income", "Expense"],
+                     state="readonly", width=12).pack(pady=5)
+
+        def save():
+            dataset = dataset_var.get()
+            filter_type = filter_var.get()
+            name = "Monthly_Totals" if dataset == "monthly" else "Category_Totals"
+            file_path = self.ask_export_path(f"PocketPlanner_{name}.csv")
+            if not file_path:
+                return
+            win.destroy()
 
-        c.save()
+            self.run_export(
+                "Exporting report totals...",
+                lambda repo: export_data(repo, file_path, dataset, filter_type=filter_type),
+                f"Report totals exported successfully!\n\n{file_path}",
+                "Data Exported")
 
-        messagebox.showinfo("PDF Exported", f"Yearly report saved successfully!\n\n{file_path}")
+        tk.Button(win, text="💾 Save",
+                  command=save,
+                  bg=self.theme["ACCENT"], fg="white",
+                  font=("Segoe UI", 11, "bold"),
+                  relief="flat", padx=20, pady=8).pack(pady=10)
 
     # ---------------- SETTINGS PAGE ---------------- #
     def show_settings_page(self):
@@ -1361,7 +3979,7 @@ class BudgetApp:
                  font=("Segoe UI", 12, "bold")).pack(pady=10)
 
         currency_var = tk.StringVar(value=self.get_currency())
-        currency_list = ["INR", "USD", "EUR", "GBP", "JPY"]
+        currency_list = list(CURRENCY_FORMATS)
 
         currency_box = ttk.Combobox(self.content_frame, textvariable=currency_var,
                                     values=currency_list, width=20)
@@ -1374,6 +3992,8 @@ class BudgetApp:
 
         currency_box.bind("<<ComboboxSelected>>", save_currency)
 
+        self.show_missing_rates(self.content_frame, self.repo.currencies_without_rates())
+
         # Monthly Budget
         tk.Label(self.content_frame, text="Set Monthly Budget:",
                  bg=self.theme["BG"], fg=self.theme["TEXT"],
@@ -1390,14 +4010,55 @@ class BudgetApp:
         def save_budget(event=None):
             try:
                 value = float(budget_entry.get())
-                self.set_monthly_budget(value)
-                messagebox.showinfo("Saved ✅", f"Monthly Budget set to {self.format_money(value)}")
-                self.show_dashboard()
-            except:
+            except ValueError:
                 messagebox.showerror("Error ❌", "Enter valid number!")
+                return
+
+            self.set_monthly_budget(value)
+            messagebox.showinfo("Saved ✅", f"Monthly Budget set to {self.format_money(value)}")
+            self.show_dashboard()
 
         budget_entry.bind("<Return>", save_budget)
 
+        # Auto Backup
+        tk.Label(self.content_frame, text="Auto Backup on Exit 🗄",
+                 bg=self.theme["BG"], fg=self.theme["TEXT"],
+                 font=("Segoe UI", 12, "bold")).pack(pady=10)
+
+        keep, max_age_days, compress = self.repo.get_auto_backup_settings()
+        keep_var = tk.StringVar(value=str(keep))
+        age_var = tk.StringVar(value=str(max_age_days))
+        compress_var = tk.BooleanVar(value=compress)
+
+        backup_row = tk.Frame(self.content_frame, bg=self.theme["BG"])
+        backup_row.pack(pady=5)
+
+        tk.Label(backup_row, text="Keep", bg=self.theme["BG"], fg=self.theme["MUTED"]).pack(side="left")
+        tk.Spinbox(backup_row, from_=0, to=999, textvariable=keep_var, width=5).pack(side="left", padx=5)
+        tk.Label(backup_row, text="copies, up to", bg=self.theme["BG"], fg=self.theme["MUTED"]).pack(side="left")
+        tk.Spinbox(backup_row, from_=0, to=3650, textvariable=age_var, width=5).pack(side="left", padx=5)
+        tk.Label(backup_row, text="days old", bg=self.theme["BG"], fg=self.theme["MUTED"]).pack(side="left")
+        tk.Checkbutton(backup_row, text="Compress", variable=compress_var,
+                       bg=self.theme["BG"], fg=self.theme["TEXT"],
+                       selectcolor=self.theme["CARD"]).pack(side="left", padx=10)
+
+        def save_backup_settings():
+            try:
+                keep_value = int(keep_var.get())
+                age_value = int(age_var.get())
+            except ValueError:
+                messagebox.showerror("Error ❌", "Enter valid numbers!")
+                return
+            self.repo.set_settings(backup_keep=keep_value, backup_max_age_days=age_value,
+                                   backup_compress=int(compress_var.get()))
+            messagebox.showinfo("Saved ✅", "Auto backup settings saved!\n\n0 means no limit.")
+
+        tk.Button(backup_row, text="Save",
+                  command=save_backup_settings,
+                  bg=self.theme["ACCENT2"], fg=self.theme["TEXT"],
+                  relief="flat", font=("Segoe UI", 10, "bold"),
+                  padx=12, pady=4).pack(side="left", padx=5)
+
         # Buttons
         tk.Button(self.content_frame, text="🔐 Change PIN",
                   command=self.change_pin_window,
@@ -1411,6 +4072,18 @@ class BudgetApp:
                   font=("Segoe UI", 12, "bold"),
                   relief="flat", padx=20, pady=10).pack(pady=10)
 
+        tk.Button(self.content_frame, text="📥 Import Bank Statement",
+                  command=self.import_statement_window,
+                  bg=self.theme["ACCENT"], fg="white",
+                  font=("Segoe UI", 12, "bold"),
+                  relief="flat", padx=20, pady=10).pack(pady=10)
+
+        tk.Button(self.content_frame, text="💱 Import Exchange Rates",
+                  command=self.import_exchange_rates_file,
+                  bg=self.theme["ACCENT"], fg="white",
+                  font=("Segoe UI", 12, "bold"),
+                  relief="flat", padx=20, pady=10).pack(pady=10)
+
         tk.Button(self.content_frame, text="📦 Backup Database",
                   command=self.backup_database,
                   bg=self.theme["PURPLE"], fg="white",
@@ -1423,12 +4096,163 @@ class BudgetApp:
                   font=("Segoe UI", 12, "bold"),
                   relief="flat", padx=20, pady=10).pack(pady=10)
 
+        tk.Button(self.content_frame, text="🔄 Rebuild Report Totals & Search",
+                  command=self.rebuild_report_totals,
+                  bg=self.theme["PURPLE"], fg="white",
+                  font=("Segoe UI", 12, "bold"),
+                  relief="flat", padx=20, pady=10).pack(pady=10)
+
         tk.Button(self.content_frame, text="⚠ Clear All Transactions",
                   command=self.clear_all_data,
                   bg=self.theme["DANGER"], fg="white",
                   font=("Segoe UI", 12, "bold"),
                   relief="flat", padx=20, pady=10).pack(pady=10)
 
+    # ---------------- IMPORT STATEMENT ---------------- #
+    def import_statement_window(self):
+        file_path = filedialog.askopenfilename(filetypes=[
+            ("Bank Statements", "*.csv *.ofx *.qfx *.qif"),
+            ("CSV Files", "*.csv"), ("OFX Files", "*.ofx *.qfx"), ("QIF Files", "*.qif")])
+        if not file_path:
+            return
+
+        if statement_format(file_path) == "ofx":
+            self.run_import(file_path)
+            return
+
+        win = tk.Toplevel(self.root)
+        win.title("Import Statement 📥")
+        win.configure(bg=self.theme["BG"])
+        win.resizable(False, False)
+
+        tk.Label(win, text="Import Statement 📥",
+                 font=("Segoe UI", 16, "bold"),
+                 bg=self.theme["BG"], fg=self.theme["TEXT"]).grid(row=0, column=0, columnspan=2, pady=15)
+
+        form_row = 1
+        mapping_vars = {}
+        if statement_format(file_path) == "csv":
+            header = read_csv_header(file_path)
+            guessed = guess_csv_mapping(header)
+            labels = {"date": "Date", "title": "Description", "amount": "Amount",
+                      "debit": "Debit (money out)", "credit": "Credit (money in)",
+                      "type": "Type (optional)", "category": "Category (optional)",
+                      "currency": "Currency (optional)"}
+
+            for field in CSV_IMPORT_FIELDS:
+                tk.Label(win, text=labels[field], bg=self.theme["BG"],
+                         fg=self.theme["MUTED"]).grid(row=form_row, column=0, sticky="w", padx=15, pady=4)
+                var = tk.StringVar(value=guessed.get(field, ""))
+                ttk.Combobox(win, textvariable=var, values=[""] + header,
+                             state="readonly", width=25).grid(row=form_row, column=1, padx=15, pady=4)
+                mapping_vars[field] = var
+                form_row += 1
+
+        tk.Label(win, text="Date Format", bg=self.theme["BG"],
+                 fg=self.theme["MUTED"]).grid(row=form_row, column=0, sticky="w", padx=15, pady=4)
+        date_format_var = tk.StringVar(value="Auto")
+        ttk.Combobox(win, textvariable=date_format_var, values=("Auto",) + IMPORT_DATE_FORMATS,
+                     state="readonly", width=25).grid(row=form_row, column=1, padx=15, pady=4)
+        form_row += 1
+
+        tk.Label(win, text="Statement Currency", bg=self.theme["BG"],
+                 fg=self.theme["MUTED"]).grid(row=form_row, column=0, sticky="w", padx=15, pady=4)
+        currency_var = tk.StringVar(value=self.get_currency())
+        ttk.Combobox(win, textvariable=currency_var, values=list(CURRENCY_FORMATS),
+                     width=25).grid(row=form_row, column=1, padx=15, pady=4)
+
+        def start_import():
+            mapping = None
+            if mapping_vars:
+                mapping = {field: var.get() for field, var in mapping_vars.items() if var.get()}
+                has_amount = "amount" in mapping or ("debit" in mapping and "credit" in mapping)
+                if "date" not in mapping or "title" not in mapping or not has_amount:
+                    messagebox.showerror("Error", "Choose the Date, Description and Amount "
+                                                  "(or Debit and Credit) columns!")
+                    return
+
+            date_format = None if date_format_var.get() == "Auto" else date_format_var.get()
+            win.destroy()
+            self.run_import(file_path, mapping, date_format, currency_var.get().strip().upper() or None)
+
+        tk.Button(win, text="📥 Import",
+                  command=start_import,
+                  bg=self.theme["ACCENT"], fg="white",
+                  font=("Segoe UI", 11, "bold"),
+                  relief="flat", padx=20, pady=10).grid(row=form_row + 1, column=0, columnspan=2, pady=15)
+
+    def progress_window(self, title, text):
+        """A small window with a progress bar; returns (window, set_fraction)."""
+        win = tk.Toplevel(self.root)
+        win.title(title)
+        win.geometry("420x140")
+        win.configure(bg=self.theme["BG"])
+        win.resizable(False, False)
+        win.protocol("WM_DELETE_WINDOW", lambda: None)
+
+        tk.Label(win, text=text,
+                 font=("Segoe UI", 12, "bold"),
+                 bg=self.theme["BG"], fg=self.theme["TEXT"]).pack(pady=15)
+
+        progress_bar = ttk.Progressbar(win, length=360, mode="determinate", maximum=100)
+        progress_bar.pack(pady=10)
+
+        def progressed(fraction):
+            # the theme toggle destroys every window, this one included
+            if progress_bar.winfo_exists():
+                progress_bar["value"] = fraction * 100
+
+        return win, progressed
+
+    def close_progress_window(self, win):
+        if win.winfo_exists():
+            win.destroy()
+
+    def run_import(self, file_path, mapping=None, date_format=None, currency=None):
+        win, progressed = self.progress_window("Importing...", f"Importing {os.path.basename(file_path)}")
+        self.running_imports.add(file_path)
+
+        def done(result):
+            imported, skipped = result
+            self.running_imports.discard(file_path)
+            self.close_progress_window(win)
+            self.mark_data_changed()
+            message = f"Imported {imported} transactions."
+            if skipped:
+                message += f"\n\nSkipped {skipped} lines that could not be read."
+            messagebox.showinfo("Import Complete ✅", message)
+
+        def failed(error):
+            self.running_imports.discard(file_path)
+            self.close_progress_window(win)
+            messagebox.showerror("Import Failed", str(error))
+
+        self.worker.submit(
+            "import:" + file_path,
+            lambda repo, progress: import_statement(repo, file_path, mapping, date_format, progress, currency),
+            done, failed, progressed)
+
+    def import_exchange_rates_file(self):
+        file_path = filedialog.askopenfilename(filetypes=[("CSV Files", "*.csv")])
+        if not file_path:
+            return
+
+        def done(result):
+            imported, skipped = result
+            # imported on the worker's connection
+            self.repo.invalidate_rate_caches()
+            self.mark_data_changed()
+            message = f"Imported {imported} exchange rates."
+            if skipped:
+                message += f"\n\nSkipped {skipped} lines that could not be read."
+            messagebox.showinfo("Import Complete ✅", message)
+            self.show_settings_page()
+
+        self.worker.submit(
+            "rates:" + file_path,
+            lambda repo: import_exchange_rates(repo, file_path),
+            done, lambda error: messagebox.showerror("Import Failed", str(error)))
+
     # ---------------- CHANGE PIN ---------------- #
     def change_pin_window(self):
         win = tk.Toplevel(self.root)
@@ -1458,8 +4282,7 @@ class BudgetApp:
             new_pin = new_entry.get()
             confirm_pin = confirm_entry.get()
 
-            cursor.execute("SELECT app_pin FROM settings WHERE id=1")
-            saved = cursor.fetchone()[0]
+            saved = self.repo.get_setting("app_pin")
 
             if old_pin != saved:
                 messagebox.showerror("Error", "Old PIN is wrong!")
@@ -1473,11 +4296,10 @@ class BudgetApp:
                 messagebox.showerror("Error", "PIN does not match!")
                 return
 
-            cursor.execute("UPDATE settings SET app_pin=? WHERE id=1", (new_pin,))
-            conn.commit()
+            self.repo.set_settings(app_pin=new_pin)
 
             messagebox.showinfo("Success", "PIN changed successfully!")
-            win.destroy()
+            self.close_progress_window(win)
 
         tk.Button(win, text="💾 Save PIN",
                   command=save_new_pin,
@@ -1513,11 +4335,10 @@ class BudgetApp:
                 messagebox.showerror("Error", "Fill all fields!")
                 return
 
-            cursor.execute("UPDATE settings SET security_question=?, security_answer=? WHERE id=1", (q, a))
-            conn.commit()
+            self.repo.set_settings(security_question=q, security_answer=a)
 
             messagebox.showinfo("Saved", "Security Question Updated!")
-            win.destroy()
+            self.close_progress_window(win)
 
         tk.Button(win, text="💾 Save",
                   command=save_security,
@@ -1527,13 +4348,53 @@ class BudgetApp:
 
     # ---------------- CLEAR ALL DATA ---------------- #
     def clear_all_data(self):
+        if self.import_running():
+            return
+
         confirm = messagebox.askyesno("Confirm", "Delete ALL transactions?")
-        if confirm:
-            cursor.execute("DELETE FROM transactions")
-            conn.commit()
+        if not confirm:
+            return
+
+        win, _ = self.progress_window("Deleting...", "Deleting all transactions")
+        # Keep edits out until the wipe is committed
+        win.grab_set()
+
+        def done(_):
+            self.close_progress_window(win)
+            self.mark_data_changed()
             messagebox.showinfo("Done", "All transactions deleted!")
             self.show_dashboard()
 
+        def failed(error):
+            self.close_progress_window(win)
+            messagebox.showerror("Delete Failed", str(error))
+
+        self.worker.submit("clear", lambda repo: repo.clear_transactions(), done, failed)
+
+    # ---------------- REBUILD REPORT TOTALS ---------------- #
+    def rebuild_report_totals(self):
+        if self.import_running():
+            return
+
+        win, _ = self.progress_window("Rebuilding...", "Rebuilding report totals and search index")
+        # Keep edits out until both rebuilds are committed
+        win.grab_set()
+
+        def rebuild(repo):
+            repo.rebuild_monthly_totals()
+            repo.rebuild_search_index()
+
+        def done(_):
+            self.close_progress_window(win)
+            self.mark_data_changed()
+            messagebox.showinfo("Done", "Report totals and search index rebuilt from transactions!")
+
+        def failed(error):
+            self.close_progress_window(win)
+            messagebox.showerror("Rebuild Failed", str(error))
+
+        self.worker.submit("rebuild", rebuild, done, failed)
+
     # ---------------- BACKUP / RESTORE ---------------- #
     def backup_database(self):
         file_path = filedialog.asksaveasfilename(defaultextension=".db",
@@ -1541,8 +4402,18 @@ class BudgetApp:
         if not file_path:
             return
 
-        shutil.copy(DB_PATH, file_path)
-        messagebox.showinfo("Backup", "Database backup saved successfully!")
+        win, progressed = self.progress_window("Backing up...", f"Saving {os.path.basename(file_path)}")
+
+        def done(_):
+            self.close_progress_window(win)
+            messagebox.showinfo("Backup", "Database backup saved successfully!")
+
+        def failed(error):
+            self.close_progress_window(win)
+            messagebox.showerror("Backup Failed", str(error))
+
+        self.worker.submit("backup", lambda repo, progress: repo.backup_to(file_path, progress),
+                           done, failed, progressed)
 
     def restore_database(self):
         file_path = filedialog.askopenfilename(filetypes=[("Database Files", "*.db")])
@@ -1553,27 +4424,41 @@ class BudgetApp:
         if not confirm:
             return
 
-        try:
-            conn.close()
-        except:
-            pass
+        win, progressed = self.progress_window("Restoring...", f"Restoring {os.path.basename(file_path)}")
+        # Keep edits out while the database is being replaced
+        win.grab_set()
+
+        def done(_):
+            self.close_progress_window(win)
+            self.repo.reconnect()
+            # reconnecting resets the change marker; the replaced database
+            # still has to be backed up on exit
+            self.backup_marker = None
+            self.mark_data_changed()
+            self.show_dashboard()
+            messagebox.showinfo("Restore", "Database restored successfully!")
 
-        shutil.copy(file_path, DB_PATH)
+        def failed(error):
+            self.close_progress_window(win)
+            messagebox.showerror("Restore Failed", str(error))
 
-        messagebox.showinfo("Restore", "Database restored successfully!\n\nRestart app now.")
-        self.root.destroy()
+        self.worker.submit("restore", lambda repo, progress: repo.restore_from(file_path, progress),
+                           done, failed, progressed)
 
 
 # ==========================================================
 # SPLASH SCREEN
 # ==========================================================
-def splash_screen():
-    splash = tk.Tk()
-    splash.title("Loading...")
-    splash.geometry("460x260")
-    splash.configure(bg="#121212")
-    splash.resizable(False, False)
+def splash_screen(root, startup, on_done):
+    """Show the splash in root while startup() runs on another thread, then
+    remove it and call on_done()."""
+    root.title("Loading...")
+    root.geometry("460x260")
+    root.configure(bg="#121212")
+    root.resizable(False, False)
 
+    splash = tk.Frame(root, bg="#121212")
+    splash.pack(fill="both", expand=True)
 
 
     label = tk.Label(splash, text="💰 PocketPlanner",
@@ -1588,6 +4473,15 @@ def splash_screen():
 
     dots = ["", ".", "..", "..."]
     i = 0
+    errors = []
+
+    def run():
+        try:
+            startup()
+        except Exception as e:
+            errors.append(e)
+
+    worker = threading.Thread(target=run, name="pocketplanner-startup", daemon=True)
 
     def animate():
         nonlocal i
@@ -1595,21 +4489,78 @@ def splash_screen():
         i += 1
         splash.after(400, animate)
 
+    def wait():
+        if worker.is_alive():
+            splash.after(20, wait)
+            return
+
+        splash.destroy()
+        if errors:
+            messagebox.showerror("Startup Failed", f"Could not open the database:\n\n{errors[0]}")
+            root.destroy()
+            return
+        on_done()
+
     animate()
-    splash.after(2300, splash.destroy)
-    splash.mainloop()
+    mark_startup("splash window")
+    worker.start()
+    wait()
+
+
+# ==========================================================
+# STARTUP
+# ==========================================================
+startup_marks = []
+
+
+def mark_startup(stage):
+    startup_marks.append((stage, time.perf_counter()))
+
+
+def load_tkinter():
+    """Import tkinter into the module globals the GUI code uses."""
+    global tk, ttk, messagebox, filedialog
+    import tkinter as tk
+    from tkinter import ttk, messagebox, filedialog
+
+
+def print_startup_profile():
+    previous = STARTUP_CLOCK
+    for stage, at in startup_marks:
+        print(f"{stage:<20}{(at - previous) * 1000:8.1f} ms", file=sys.stderr)
+        previous = at
+    print(f"{'total':<20}{(previous - STARTUP_CLOCK) * 1000:8.1f} ms", file=sys.stderr)
+
+
+def bootstrap(db_path):
+    """Create or migrate the database schema. Uses (and closes) its own
+    connection, so it can run on the splash screen's worker thread."""
+    repo = BudgetRepository(db_path)
+    try:
+        repo.init_schema()
+    finally:
+        repo.close()
+    mark_startup("database bootstrap")
+
+
+def warm_up_imports():
+    """Import the charting stack in the background while the user types their PIN."""
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg  # noqa: F401
+    from matplotlib.figure import Figure  # noqa: F401
 
 
 # ==========================================================
 # LOGIN SCREEN WITH FORGOT PIN
 # ==========================================================
-def open_login():
-    login = tk.Tk()
-    login.title("PocketPlanner Login 🔐")
-    login.geometry("430x470")
-    login.configure(bg="#121212")
-    login.resizable(False, False)
+def open_login(root, repo, on_ready=None):
+    """Show the login screen in root; on_ready() runs once it is up and idle."""
+    root.title("PocketPlanner Login 🔐")
+    root.geometry("430x470")
+    root.configure(bg="#121212")
+    root.resizable(False, False)
 
+    login = tk.Frame(root, bg="#121212")
+    login.pack(fill="both", expand=True)
 
 
     entered_pin = tk.StringVar()
@@ -1629,12 +4580,12 @@ def open_login():
     pin_display.focus_set()
 
     def check_pin(event=None):
-        cursor.execute("SELECT app_pin FROM settings WHERE id=1")
-        saved_pin = cursor.fetchone()[0]
+        saved_pin = repo.get_setting("app_pin")
 
         if entered_pin.get() == saved_pin:
+            root.unbind("<Return>")
             login.destroy()
-            open_main_app()
+            open_main_app(root, repo)
         else:
             messagebox.showerror("Wrong PIN", "Incorrect PIN!")
             entered_pin.set("")
@@ -1646,8 +4597,7 @@ def open_login():
         win.configure(bg="#121212")
         win.resizable(False, False)
 
-        cursor.execute("SELECT security_question FROM settings WHERE id=1")
-        question = cursor.fetchone()[0]
+        question = repo.get_setting("security_question")
 
         tk.Label(win, text="Forgot PIN ❓",
                  font=("Segoe UI", 16, "bold"),
@@ -1663,12 +4613,10 @@ def open_login():
 
         def verify():
             answer = ans_entry.get().strip().lower()
-            cursor.execute("SELECT security_answer FROM settings WHERE id=1")
-            saved_ans = cursor.fetchone()[0].strip().lower()
+            saved_ans = repo.get_setting("security_answer").strip().lower()
 
             if answer == saved_ans:
-                cursor.execute("UPDATE settings SET app_pin=? WHERE id=1", ("1234",))
-                conn.commit()
+                repo.set_settings(app_pin="1234")
                 messagebox.showinfo("Reset Success", "PIN reset to: 1234")
                 win.destroy()
             else:
@@ -1689,19 +4637,255 @@ def open_login():
               font=("Segoe UI", 10, "bold"),
               relief="flat").pack(pady=10)
 
-    login.bind("<Return>", check_pin)
-    login.mainloop()
+    root.bind("<Return>", check_pin)
+    if on_ready is not None:
+        root.after_idle(on_ready)
+
 
+def open_main_app(root, repo):
+    root.resizable(True, True)
+    BudgetApp(root, repo)
 
-def open_main_app():
-    root = tk.Tk()
-    BudgetApp(root)
-    root.mainloop()
+
+# ==========================================================
+# COMMAND LINE
+# ==========================================================
+def cli_summary(repo, args):
+    currency = repo.get_currency()
+    income, expense, balance = repo.summary()
+    now = datetime.now()
+    budget = repo.get_monthly_budget()
+
+    print(f"Income:   {format_currency(currency, income)}")
+    print(f"Expense:  {format_currency(currency, expense)}")
+    print(f"Balance:  {format_currency(currency, balance)}")
+    print(f"{MONTH_NAMES[now.month - 1]} expense: {format_currency(currency, repo.month_expense(now.year, now.month))}"
+          + (f" of {format_currency(currency, budget)} budget" if budget else ""))
+
+
+def cli_month(repo, args):
+    currency = repo.get_currency()
+    income = expense = 0
+    categories = {}
+    for _, _, t_type, category, total in repo.period_totals(args.year, args.month):
+        if t_type == "Income":
+            income += total
+        else:
+            expense += total
+            categories[category] = categories.get(category, 0) + total
+
+    print(f"{MONTH_NAMES[args.month - 1]} {args.year}")
+    print(f"Income:   {format_currency(currency, income)}")
+    print(f"Expense:  {format_currency(currency, expense)}")
+    print(f"Savings:  {format_currency(currency, income - expense)}")
+    for category, total in sorted(categories.items(), key=lambda x: x[1], reverse=True):
+        print(f"  {category:<20} {format_currency(currency, total)}")
+
+
+def cli_year(repo, args):
+    currency = repo.get_currency()
+    months = {m: [0, 0] for m in range(1, 13)}
+    for _, month, t_type, _, total in repo.period_totals(args.year):
+        months[month][0 if t_type == "Income" else 1] += total
+
+    print(f"{args.year}{'Income':>20}{'Expense':>20}{'Savings':>20}")
+    for month, (income, expense) in months.items():
+        print(f"{MONTH_NAMES[month - 1][:3]:<4}"
+              f"{format_currency(currency, income):>20}"
+              f"{format_currency(currency, expense):>20}"
+              f"{format_currency(currency, income - expense):>20}")
+
+
+def cli_pdf(repo, args):
+    if args.period == "month":
+        write_monthly_pdf_report(repo, args.output, args.year, args.month)
+    elif args.period == "year":
+        write_yearly_pdf_report(repo, args.output, args.year)
+    else:
+        os.makedirs(args.output, exist_ok=True)
+        try:
+            write_monthly_pdf_reports(repo, args.output, args.year, chart_pool())
+        finally:
+            shutdown_chart_pool()
+    print(f"Saved {args.output}")
+
+
+def cli_import(repo, args):
+    mapping = None
+    if args.map:
+        mapping = dict(pair.split("=", 1) for pair in args.map)
+    try:
+        imported, skipped = import_statement(repo, args.file, mapping, args.date_format, currency=args.currency)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    print(f"Imported {imported} transactions" + (f", skipped {skipped} unreadable lines" if skipped else ""))
+
+
+def cli_rates(repo, args):
+    imported, skipped = import_exchange_rates(repo, args.file)
+    print(f"Imported {imported} exchange rates" + (f", skipped {skipped} unreadable lines" if skipped else ""))
+
+
+def cli_export(repo, args):
+    count = export_data(repo, args.output, args.dataset, args.search, args.type, args.sort)
+    print(f"Exported {count} rows to {args.output}")
+
+
+def cli_backup(repo, args):
+    repo.backup_to(args.output)
+    print(f"Saved {args.output}")
+
+
+def cli_recurring(repo, args):
+    if args.action == "add":
+        start = parse_import_date(args.start)[0] if args.start else None
+        end = parse_import_date(args.until)[0] if args.until else None
+        try:
+            rule_id = repo.add_recurring_rule(args.title, args.amount, args.type, args.category,
+                                              (args.currency or repo.get_currency()).upper(),
+                                              args.frequency, args.every, start, end)
+        except ValueError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 1
+        created = repo.materialize_recurring()
+        print(f"Added recurring rule {rule_id}, created {created} transactions")
+    elif args.action == "run":
+        print(f"Created {repo.materialize_recurring()} due transactions")
+    elif args.action == "end":
+        repo.end_recurring_rule(args.rule_id, parse_import_date(args.on)[0] if args.on else None)
+        print(f"Ended recurring rule {args.rule_id}")
+    else:
+        now = datetime.now()
+        for rule_id, title, amount, currency, t_type, category, frequency, interval, start, end in \
+                repo.recurring_rules():
+            upcoming = next_occurrence(frequency, interval, start, end, now)
+            print(f"{rule_id:>4}  {title[:24]:<24} {t_type:<8}{format_currency(currency, amount):>16}  "
+                  f"{describe_recurrence(frequency, interval):<16}"
+                  + (f"next {upcoming.strftime(DATE_FORMAT)}" if upcoming else "ended"))
+
+
+def cli_check(repo, args):
+    problems = repo.integrity_check()
+    for problem in problems:
+        print(problem)
+    print("ok" if not problems else f"{len(problems)} problems found")
+    missing_rates = repo.currencies_without_rates()
+    if missing_rates:
+        print(f"warning: no exchange rates for {', '.join(missing_rates)}; those amounts are not converted")
+    return 1 if problems else 0
+
+
+def build_cli_parser():
+    now = datetime.now()
+    parser = argparse.ArgumentParser(
+        prog="PocketPlanner",
+        description="PocketPlanner budget tracker. Run without a command to open the app.")
+    parser.add_argument("--db", default=DB_PATH, help="database file (default: %(default)s)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print how long each startup step took to stderr")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    commands.add_parser("summary", help="overall income, expense and balance").set_defaults(run=cli_summary)
+
+    month = commands.add_parser("month", help="monthly report")
+    month.add_argument("--year", type=int, default=now.year)
+    month.add_argument("--month", type=int, choices=range(1, 13), default=now.month)
+    month.set_defaults(run=cli_month)
+
+    year = commands.add_parser("year", help="yearly report, month by month")
+    year.add_argument("--year", type=int, default=now.year)
+    year.set_defaults(run=cli_year)
+
+    pdf = commands.add_parser("pdf", help="write a monthly or yearly PDF report, or all 12 monthly ones")
+    pdf.add_argument("period", choices=["month", "year", "months"])
+    pdf.add_argument("-o", "--output", required=True, help="PDF file, or a folder for \"months\"")
+    pdf.add_argument("--year", type=int, default=now.year)
+    pdf.add_argument("--month", type=int, choices=range(1, 13), default=now.month)
+    pdf.set_defaults(run=cli_pdf)
+
+    importer = commands.add_parser("import", help="import a CSV, OFX/QFX or QIF bank statement")
+    importer.add_argument("file")
+    importer.add_argument("--map", nargs="+", metavar="FIELD=COLUMN",
+                          help=f"CSV column mapping, fields: {', '.join(CSV_IMPORT_FIELDS)} "
+                               "(default: guessed from the header)")
+    importer.add_argument("--date-format", help="strptime format of the statement dates")
+    importer.add_argument("--currency", help="currency of the statement (default: the display currency)")
+    importer.set_defaults(run=cli_import)
+
+    rates = commands.add_parser("rates", help=f"import a CSV of daily exchange rates "
+                                              f"(date, currency, units per {EXCHANGE_RATE_BASE})")
+    rates.add_argument("file")
+    rates.set_defaults(run=cli_rates)
+
+    recurring = commands.add_parser("recurring", help="list, add or end recurring transactions")
+    recurring_actions = recurring.add_subparsers(dest="action", metavar="ACTION")
+    recurring_actions.add_parser("list", help="list the rules and when each is next due (default)")
+    recurring_actions.add_parser("run", help="create the transactions that fell due since the last run")
+    recurring_add = recurring_actions.add_parser("add", help="add a rule and create its due transactions")
+    recurring_add.add_argument("title")
+    recurring_add.add_argument("amount", type=float)
+    recurring_add.add_argument("frequency", choices=list(RECURRING_FREQUENCIES))
+    recurring_add.add_argument("--every", type=int, default=1, help="repeat every N days/weeks/months/years")
+    recurring_add.add_argument("--type", choices=["Income", "Expense"], default="Expense")
+    recurring_add.add_argument("--category", choices=categories_list, default="Other ✨")
+    recurring_add.add_argument("--currency", help="default: the display currency")
+    recurring_add.add_argument("--start", help="first occurrence (default: now)")
+    recurring_add.add_argument("--until", help="last day of the rule (default: no end)")
+    recurring_end = recurring_actions.add_parser("end", help="stop a rule")
+    recurring_end.add_argument("rule_id", type=int)
+    recurring_end.add_argument("--on", help="last day of the rule (default: today)")
+    recurring.set_defaults(run=cli_recurring)
+
+    export = commands.add_parser("export", help="export data to CSV, JSON Lines or Parquet")
+    export.add_argument("dataset", choices=list(EXPORT_COLUMNS))
+    export.add_argument("-o", "--output", required=True)
+    export.add_argument("--search", default="")
+    export.add_argument("--type", choices=["All", "Income", "Expense"], default="All")
+    export.add_argument("--sort", choices=list(SORT_ORDERS), default="Latest")
+    export.set_defaults(run=cli_export)
+
+    backup = commands.add_parser("backup", help="copy the database to a file")
+    backup.add_argument("output")
+    backup.set_defaults(run=cli_backup)
+
+    commands.add_parser("check", help="run SQLite and search index integrity checks").set_defaults(run=cli_check)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_cli_parser().parse_args(argv)
+    mark_startup("imports")
+
+    if args.command is None:
+        load_tkinter()
+        mark_startup("tkinter import")
+
+        # One Tk root hosts the splash, the login screen and then the app
+        root = tk.Tk()
+
+        def login_ready():
+            mark_startup("login window")
+            if args.profile_startup:
+                print_startup_profile()
+            threading.Thread(target=warm_up_imports, name="pocketplanner-imports", daemon=True).start()
+
+        splash_screen(root, lambda: bootstrap(args.db),
+                      lambda: open_login(root, BudgetRepository(args.db), login_ready))
+        root.mainloop()
+        return 0
+
+    bootstrap(args.db)
+    repo = BudgetRepository(args.db)
+    try:
+        return args.run(repo, args) or 0
+    finally:
+        repo.close()
 
 
 # ==========================================================
 # RUN APP
 # ==========================================================
 if __name__ == "__main__":
-    splash_screen()
-    open_login()
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""Headless benchmarks for PocketPlanner's data paths.
+
+Builds seeded synthetic ledgers (1k, 100k and 1M transactions by default),
+times every query, export, import, recurring catch-up and report path against them and writes
+the results to JSON:
+
+    python benchmarks/run_benchmarks.py                       # all sizes
+    python benchmarks/run_benchmarks.py --sizes 1000 100000
+    python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json
+
+Timings are wall-clock milliseconds (median and min over --repeat runs).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import PocketPlanner as pp  # noqa: E402
+
+
+# Category emoji are missing from matplotlib's default font; not what we measure
+warnings.filterwarnings("ignore", message="Glyph .* missing from font")
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+DEFAULT_SEED = 42
+FIRST_YEAR = 2019
+YEARS = 6
+
+PAYEES = {
+    "Food 🍔": ["Fresh Mart", "Corner Cafe", "Pizza Place", "City Grocers"],
+    "Travel 🚗": ["Metro Card", "Uber Trip", "Fuel Station", "Airline Tickets"],
+    "Shopping 🛍️": ["Online Store", "Shoe Shop", "Book World"],
+    "Bills 💡": ["Electricity Bill", "Internet Bill", "Phone Bill", "Rent"],
+    "Health 💊": ["Pharmacy", "Dental Clinic"],
+    "Education 📚": ["Course Fee", "Stationery"],
+    "Entertainment 🎬": ["Cinema", "Streaming"],
+    "Gifts 🎁": ["Birthday Gift"],
+    "Other ✨": ["Misc"],
+}
+
+# Home currency, then the foreign ones an eighth of the expenses are paid in,
+# with their rough units per USD
+HOME_CURRENCY = "INR"
+FOREIGN_CURRENCIES = {"USD": 1.0, "EUR": 0.9, "GBP": 0.78}
+HOME_RATE = 80.0
+
+
+def generate_rows(count, seed=DEFAULT_SEED):
+    """Yield `count` reproducible (title, amount, type, category, datetime, currency)
+    rows spread over YEARS years, roughly one income per eight expenses."""
+    rng = random.Random(seed)
+    start = datetime(FIRST_YEAR, 1, 1)
+    span_minutes = YEARS * 365 * 24 * 60
+    categories = list(PAYEES)
+
+    for _ in range(count):
+        when = start + timedelta(minutes=rng.randrange(span_minutes))
+        if rng.random() < 0.11:
+            yield "Salary Credit", round(rng.uniform(1000, 5000), 2), "Income", "Salary 💼", when, HOME_CURRENCY
+        else:
+            category = rng.choice(categories)
+            title = f"{rng.choice(PAYEES[category])} #{rng.randrange(1000)}"
+            currency = rng.choice(list(FOREIGN_CURRENCIES)) if rng.random() < 0.125 else HOME_CURRENCY
+            yield title, round(rng.uniform(1, 500), 2), "Expense", category, when, currency
+
+
+def generate_rates(seed=DEFAULT_SEED):
+    """Yield reproducible daily (currency, datetime, units per USD) rates over YEARS years."""
+    rng = random.Random(seed)
+    start = datetime(FIRST_YEAR, 1, 1)
+    levels = dict(FOREIGN_CURRENCIES, **{HOME_CURRENCY: HOME_RATE})
+    del levels["USD"]
+    for day in range(YEARS * 365):
+        for currency in levels:
+            levels[currency] *= 1 + rng.gauss(0, 0.003)
+            yield currency, start + timedelta(days=day), round(levels[currency], 4)
+
+
+def build_ledger(path, count, seed=DEFAULT_SEED):
+    pp.bootstrap(path)
+    repo = pp.BudgetRepository(path)
+    repo.insert_transactions(generate_rows(count, seed))
+    repo.insert_exchange_rates(generate_rates(seed))
+    repo.set_settings(monthly_budget=20000, currency=HOME_CURRENCY)
+    return repo
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "min_ms": round(min(samples), 3),
+        "runs": repeat,
+    }
+
+
+def drain(chunks):
+    for _ in chunks:
+        pass
+
+
+def benchmark_cases(repo, workdir, size):
+    """(name, callable, is_slow) for every data path; slow ones run fewer times."""
+    year = FIRST_YEAR + YEARS // 2
+    deep_offset = max(size - pp.VirtualTable.BLOCK_SIZE, 0)
+    page = pp.VirtualTable.BLOCK_SIZE
+
+    cases = [
+        ("summary", repo.summary, False),
+        ("month_expense", lambda: repo.month_expense(year, 6), False),
+        ("period_totals_month", lambda: repo.period_totals(year, 6), False),
+        ("period_totals_year", lambda: repo.period_totals(year), False),
+        ("period_totals_all", lambda: repo.period_totals(), False),
+        ("category_totals", repo.category_totals, False),
+        ("report_years", repo.report_years, False),
+        ("dashboard_data", repo.dashboard_data, False),
+        ("count_all", lambda: repo.count_transactions("", "All"), False),
+        ("count_expense", lambda: repo.count_transactions("", "Expense"), False),
+        ("count_search", lambda: repo.count_transactions("pharmacy", "All"), False),
+        ("month_transactions", lambda: drain(repo.iter_month_transactions(year, 6)), False),
+    ]
+
+    for sort_option in pp.SORT_ORDERS:
+        if sort_option == "Relevance":
+            continue
+        cases.append((f"page_first_{sort_option.lower()}",
+                      lambda s=sort_option: repo.transactions_page("", "All", s, page), False))
+    cases += [
+        ("page_deep_latest", lambda: repo.transactions_page("", "All", "Latest", page, deep_offset), False),
+        ("page_expense_highest", lambda: repo.transactions_page("", "Expense", "Highest", page), False),
+        ("page_search_relevance", lambda: repo.transactions_page("pharm", "All", "Relevance", page), False),
+        ("page_search_amount", lambda: repo.transactions_page("12.5", "All", "Latest", page), False),
+        ("iter_all_transactions", lambda: drain(repo.iter_transactions("", "All", "Latest")), True),
+        ("export_csv", lambda: pp.export_data(repo, os.path.join(workdir, "export.csv"), "transactions"), True),
+        ("export_jsonl", lambda: pp.export_data(repo, os.path.join(workdir, "export.jsonl"), "transactions"), True),
+        ("export_monthly_totals", lambda: pp.export_data(repo, os.path.join(workdir, "monthly.csv"), "monthly"),
+         False),
+        ("backup", lambda: repo.backup_to(os.path.join(workdir, "backup.db")), True),
+        ("rebuild_monthly_totals", repo.rebuild_monthly_totals, True),
+        ("integrity_check", repo.integrity_check, True),
+    ]
+
+    try:
+        import reportlab  # noqa: F401
+        import matplotlib  # noqa: F401
+    except ImportError:
+        print("  reportlab/matplotlib not installed, skipping PDF benchmarks", file=sys.stderr)
+    else:
+        cases += [
+            ("pdf_monthly", lambda: pp.write_monthly_pdf_report(
+                repo, os.path.join(workdir, "monthly.pdf"), year, 6), True),
+            ("pdf_yearly", lambda: pp.write_yearly_pdf_report(
+                repo, os.path.join(workdir, "yearly.pdf"), year), True),
+        ]
+    return cases
+
+
+def benchmark_import(workdir, size, seed):
+    """Time importing a CSV statement of `size` rows into an empty ledger."""
+    csv_path = os.path.join(workdir, "statement.csv")
+    with open(csv_path, "w", encoding="utf-8") as f:
+        f.write("Date,Description,Amount\n")
+        for title, amount, t_type, _, when, _ in generate_rows(size, seed):
+            f.write(f"{when:%Y-%m-%d},{title},{amount if t_type == 'Income' else -amount}\n")
+
+    db_path = os.path.join(workdir, "import.db")
+    pp.bootstrap(db_path)
+    repo = pp.BudgetRepository(db_path)
+    try:
+        return timed(lambda: pp.import_statement(repo, csv_path), 1)
+    finally:
+        repo.close()
+
+
+def benchmark_recurring(repo):
+    """Time catching up YEARS years of daily, weekly and monthly rules in one run."""
+    start = datetime(FIRST_YEAR, 1, 1, 9, 0)
+    for i in range(30):
+        repo.add_recurring_rule(f"Subscription #{i}", 5 + i, "Expense", "Bills 💡", HOME_CURRENCY,
+                                ("daily", "weekly", "monthly")[i % 3], start=start)
+    return timed(lambda: repo.materialize_recurring(datetime(FIRST_YEAR + YEARS, 1, 1)), 1)
+
+
+def run(sizes, seed, repeat, slow_repeat):
+    results = {}
+    for size in sizes:
+        print(f"ledger of {size} transactions", file=sys.stderr)
+        with tempfile.TemporaryDirectory() as workdir:
+            started = time.perf_counter()
+            repo = build_ledger(os.path.join(workdir, "budget.db"), size, seed)
+            size_results = {"generate": {"median_ms": round((time.perf_counter() - started) * 1000, 3),
+                                         "min_ms": None, "runs": 1}}
+
+            for name, fn, slow in benchmark_cases(repo, workdir, size):
+                size_results[name] = timed(fn, slow_repeat if slow else repeat)
+                print(f"  {name:<28}{size_results[name]['median_ms']:>12.2f} ms", file=sys.stderr)
+
+            size_results["materialize_recurring"] = benchmark_recurring(repo)
+            print(f"  {'materialize_recurring':<28}"
+                  f"{size_results['materialize_recurring']['median_ms']:>12.2f} ms", file=sys.stderr)
+            repo.close()
+
+            size_results["import_csv"] = benchmark_import(workdir, size, seed)
+            print(f"  {'import_csv':<28}{size_results['import_csv']['median_ms']:>12.2f} ms", file=sys.stderr)
+
+        results[str(size)] = size_results
+    return results
+
+
+def compare(results, baseline_path):
+    """Print each timing next to the baseline's; returns how many got >25% slower."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+
+    regressions = 0
+    for size, cases in results.items():
+        for name, timing in cases.items():
+            before = baseline.get(size, {}).get(name)
+            if not before or not before["median_ms"]:
+                continue
+            ratio = timing["median_ms"] / before["median_ms"]
+            flag = ""
+            if ratio > 1.25:
+                flag = "  SLOWER"
+                regressions += 1
+            elif ratio < 0.8:
+                flag = "  faster"
+            print(f"{size:>8} {name:<28}{before['median_ms']:>12.2f}{timing['median_ms']:>12.2f}"
+                  f"{ratio:>8.2f}x{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark PocketPlanner's data paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per fast benchmark")
+    parser.add_argument("--slow-repeat", type=int, default=1, help="runs per export/PDF benchmark")
+    parser.add_argument("-o", "--output", default="benchmark_results.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against an earlier results file")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.seed, args.repeat, args.slow_repeat)
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "slow_repeat": args.slow_repeat,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        return 1 if compare(results, args.compare) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())